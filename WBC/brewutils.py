@@ -16,37 +16,66 @@
 
 from WBC.utils import PilotError
 from WBC.units import *
-from WBC.units import _Strength, _Volume, _Mass, _Temperature
+from WBC.units import _Strength, _Volume, _Mass, _Temperature, _horner
 
 from WBC import constants
 
 import math
 
-# figure out wort strength for given mass of extract and volume
+# figure out wort strength for given mass of extract and volume.
+#
+# With m the mass of the wort, E the extract, V the volume and p the
+# strength in Plato, E = m*p/100 and V = m/sg(p).  Therefore:
+#
+#   p * sg(p) = 100 * E / V
+#
+# where sg() is the cubic Strength.plato_to_sg.  The left side is
+# a quartic which increases monotonically with p.  Taking just the
+# linear part of sg() gives a quadratic, which we solve exactly,
+# and which is within 0.5degP of the answer even for the strongest
+# worts.  Three Newton steps on the quartic take that to the last bit.
+def _solve_strength_h(extract, volume, sqrt):
+	p2s, dp2s = Strength._p2s, Strength._dp2s
+	k1, k0 = p2s[2], p2s[3]
+	c = 100.0 * extract / volume
+
+	# p * (k0 + k1*p) = c
+	p = 2*c / (k0 + sqrt(k0*k0 + 4*k1*c))
+
+	# f(p) = p*sg(p) - c, f'(p) = sg(p) + p*sg'(p)
+	for _ in range(3):
+		sg = _horner(p2s, p)
+		dsg = _horner(dp2s, p)
+		p = p - (p*sg - c) / (sg + p*dsg)
+	return p
+
 def solve_strength(extract, volume):
-	checktypes([(extract, Mass), (volume, Volume)])
+	if __debug__:
+		checktypes([(extract, Mass), (volume, Volume)])
 	assert(volume > 0.0001)
-	# first, calculate the starting point, approximate mass = volume
-	# we will undershoot (because extract is heavier than water)
-	mass = volume
-
-	# actual volume of that amount of solution is the guess volume
-	# divided by SG.  just keep creeping up the volume until we get
-	# a reasonable accuracy.  numerical methods require no brains.
-	# Usually getting to 10^-6 of the target takes 2 loops for weak
-	# <20deg Plato worts and 3 loops for really strong worts.
-	# I am guessing the plato_to_sg calculator is the bottleneck of
-	# accuracy in any case.
-	loop = 0
-	while True:
-		plato = 100 * extract / mass
-		diff = volume - mass / Strength.plato_to_sg(plato)
-		if diff < 1.0/(1000*1000):
-			break
-		mass += diff
-		loop += 1
-		assert(loop < 10)
-	return _Strength(plato)
+	return _Strength(_solve_strength_h(float(extract), float(volume),
+	    math.sqrt))
+
+# solve_strength() for arrays of extract masses (kg) and volumes (l).
+# returns the strengths in degP as an array, see the batch
+# conversions in Strength
+def solve_strength_array(extracts, volumes):
+	from WBC.units import _np
+
+	np = _np()
+	if np:
+		rv = _solve_strength_h(np.asarray(extracts, dtype = float),
+		    np.asarray(volumes, dtype = float), np.sqrt)
+		if len(rv) > 0:
+			Strength._checkbounds(rv.max())
+		return rv
+
+	import array
+	rv = array.array('d', [_solve_strength_h(e, v, math.sqrt)
+	    for e, v in zip(extracts, volumes)])
+	for x in rv:
+		Strength._checkbounds(x)
+	return rv
 
 # iteratively find the starting strength to attain given ABV
 def solve_strength_fromabv(abv, atten):
@@ -75,64 +104,178 @@ def solve_strength_fromabv(abv, atten):
 	raise PilotError('failed to solve strenth for {}% ABV and {}% AA'.
 	    format(abv, atten))
 
-def __density_at_temp(temp):
-	checktype(temp, Temperature)
+# water density values from:
+# www.engineeringtoolbox.com/water-density-specific-weight-d_595.html
+#
+# essentially a "quick integral" over the thermal expansion coefficients
+_watertab = {
+	1:  0.9999017,
+	4:  0.9999749,
+	10: 0.9997000,
+	15: 0.9991026,
+	20: 0.9982067,
+	25: 0.9970470,
+	30: 0.9956488,
+	35: 0.9940326,
+	40: 0.9922152,
+	45: 0.99021,
+	50: 0.98804,
+	55: 0.98569,
+	60: 0.98320,
+	65: 0.98055,
+	70: 0.97776,
+	75: 0.97484,
+	80: 0.97179,
+	85: 0.96861,
+	90: 0.96531,
+	95: 0.96189,
+	100: 0.95835,
+}
+# The table interpolated linearly to 1degC steps, so that looking up
+# a temperature is just indexing.  Below 1degC, use the 1degC value.
+def _mkdensities():
+	temps = sorted(_watertab)
+	res = []
+	for t in range(0, 101):
+		hi = [x for x in temps if x >= t][0]
+		lo = ([x for x in temps if x <= t] or [hi])[-1]
+		if lo == hi:
+			res.append(_watertab[lo])
+		else:
+			res.append(_watertab[lo] + (t - lo)
+			    * (_watertab[hi] - _watertab[lo]) / (hi - lo))
+	return res
+_densities = _mkdensities()
+
+# Continous formula for low temps:
+#
+# ln rho = -0.589581 + 326.785/T - 45284.1/T^2
+#
+# Results off by some decimals at high temps.  maybe use up to a
+# certain temperature?
+#
+# Linear interpolation of the table is off by at most 7e-5 (around
+# 7degC, where the density curves the most).  The nearest table
+# entry, which we used to return, was off by up to 2e-3.  see
+# misctests/water_density_test.py
+def _water_density(temp):
 	if temp < 0 or temp > 100:
-		raise PilotError('invalid water temperature: ' + str(temp))
-
-	# Continous formula for low temps:
-	#
-	# ln rho = -0.589581 + 326.785/T - 45284.1/T^2
-	#
-	# Results off by some decimals at high temps.  maybe use up to a
-	# certain temperature?
-
-	# water density values from:
-	# www.engineeringtoolbox.com/water-density-specific-weight-d_595.html
-	#
-	# essentially a "quick integral" over the thermal expansion coefficients
-	__watertab = {
-		1:  0.9999017,
-		4:  0.9999749,
-		10: 0.9997000,
-		15: 0.9991026,
-		20: 0.9982067,
-		25: 0.9970470,
-		30: 0.9956488,
-		35: 0.9940326,
-		40: 0.9922152,
-		45: 0.99021,
-		50: 0.98804,
-		55: 0.98569,
-		60: 0.98320,
-		65: 0.98055,
-		70: 0.97776,
-		75: 0.97484,
-		80: 0.97179,
-		85: 0.96861,
-		90: 0.96531,
-		95: 0.96189,
-		100: 0.95835,
-	}
-
-	# assumes duplicate dict keys will be overriden
-	# (we don't care which equally close one we get)
-	tab = {abs(temp-_Temperature(t)): __watertab[t] for t in __watertab}
-	x = min(tab)
-	return tab[x]
+		raise PilotError('invalid water temperature: '
+		    + str(_Temperature(temp)))
+	i = int(temp)
+	if i == 100:
+		return _densities[100]
+	d = _densities[i]
+	return d + (temp - i) * (_densities[i+1] - d)
 
+def __density_at_temp(temp):
+	if __debug__:
+		checktype(temp, Temperature)
+	return _water_density(float(temp))
+
+# densities for an array of temperatures (degC), see the array
+# conversions in Strength
+def water_density_array(temps):
+	from WBC.units import _np
+
+	np = _np()
+	if np:
+		temps = np.asarray(temps, dtype = float)
+		bad = temps[(temps < 0) | (temps > 100)]
+		if len(bad) > 0:
+			_water_density(bad[0])
+		return np.interp(temps, range(0, 101), _densities)
+
+	import array
+	return array.array('d', [_water_density(x) for x in temps])
 
 def water_vol_at_temp(curvol, curtemp, totemp):
-	checktype(curvol, Volume)
+	if __debug__:
+		checktype(curvol, Volume)
 
 	return _Volume(curvol
 	    * (__density_at_temp(curtemp) / __density_at_temp(totemp)))
 
 def water_voltemp_to_mass(vol, temp):
-	checktype(vol, Volume)
+	if __debug__:
+		checktype(vol, Volume)
 
 	return _Mass(vol * __density_at_temp(temp))
 
+# Chilling wort with coolant, see bin/wbcchill for the model and
+# the wort heat capacity.  With a = wort mass * heat capacity relative
+# to the coolant, each differential coolant mass cd takes the wort
+# temperature toward the coolant temperature ct:
+#
+#   t(n) - ct = (t(n-1) - ct) * a / (a + cd)
+#
+# So, with x and y the distances of the wort and the target
+# temperatures from the coolant temperature, after k steps the wort
+# is at x * q^k, q = a/(a+cd).  The number of whole steps it takes
+# to get to within one step of the target is floor(ln(x/y) / ln(1/q)),
+# and the last step takes a*(x*q^k - y)/y.  For a true differential
+# chiller (cd -> 0), that all adds up to a*ln(x/y).
+#
+# m is the module with log, log1p and floor, i.e. math or numpy
+def _chill_h(a, x, y, cd, m):
+	if cd is None:
+		return a * m.log(x / y)
+	n = m.floor(m.log(x / y) / m.log1p(cd / a))
+	return n*cd + a*(x * (a / (a + cd))**n / y - 1)
+
+def _chill_coolant(a, wt, tt, ct, cd):
+	x, y = wt - ct, tt - ct
+	if x <= y:
+		return 0.0
+	if y <= 0:
+		raise PilotError('coolant not cool enough')
+	return _chill_h(a, x, y, cd, math)
+
+# coolant mass required to chill wortmass of wort from worttemp to
+# targettemp with coolant at coolanttemp.  wortheat is the specific
+# heat of the wort relative to the coolant.  differential is the
+# coolant mass per step, or None for a true differential chiller.
+def chill_coolant(wortmass, wortheat, worttemp, targettemp, coolanttemp,
+    differential = None):
+	if __debug__:
+		checktypes([(wortmass, Mass), (worttemp, Temperature),
+		    (targettemp, Temperature), (coolanttemp, Temperature)])
+	if differential is not None:
+		differential = float(differential)
+	return _Mass(_chill_coolant(float(wortmass) * wortheat,
+	    float(worttemp), float(targettemp), float(coolanttemp),
+	    differential))
+
+# chill_coolant() for equal length arrays of wort masses (kg),
+# relative wort heats and temperatures (degC).  returns the coolant
+# masses in kg as an array, see the batch conversions in Strength
+def chill_coolant_array(wortmasses, wortheats, worttemps, targettemps,
+    coolanttemps, differential = None):
+	from WBC.units import _np
+
+	if differential is not None:
+		differential = float(differential)
+
+	np = _np()
+	if np:
+		a = (np.asarray(wortmasses, dtype = float)
+		    * np.asarray(wortheats, dtype = float))
+		wt, tt, ct = [np.asarray(v, dtype = float)
+		    for v in [worttemps, targettemps, coolanttemps]]
+		x, y = wt - ct, tt - ct
+		cool = x > y
+		if (cool & (y <= 0)).any():
+			raise PilotError('coolant not cool enough')
+
+		# x/y = 1 makes for zero coolant where no cooling is needed
+		return _chill_h(a, np.where(cool, x, 1.0),
+		    np.where(cool, y, 1.0), differential, np)
+
+	import array
+	return array.array('d', [_chill_coolant(m * h, wt, tt, ct,
+	    differential) for m, h, wt, tt, ct in zip(wortmasses, wortheats,
+	      worttemps, targettemps, coolanttemps)])
+
 # values for carbonation equations
 _carbc1 = 0.00021705
 _carbc2 = 2617.25
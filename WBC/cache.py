@@ -0,0 +1,164 @@
+#
+# Copyright (c) 2026 Antti Kantee <pooka@iki.fi>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+#
+# On-disk caches.  One file per entry, named by the key, in a
+# per-cache directory under $WBC_CACHEDIR (default: ~/.cache/wbc).
+# Least recently used entries are evicted when the cache grows over
+# its limit.  "Used" is tracked via the file mtime.
+#
+# A cache is never allowed to make a run fail, so all I/O errors
+# are treated as a miss.
+#
+
+import hashlib
+import json
+import os
+
+def cachedir():
+	d = os.environ.get('WBC_CACHEDIR')
+	if d is None:
+		d = os.environ.get('XDG_CACHE_HOME',
+		    os.path.expanduser('~/.cache'))
+		d = os.path.join(d, 'wbc')
+	return d
+
+# Hash of the WBC sources.  Any change in the code, be it a new
+# version or local hacking, invalidates everything cached so far.
+_fingerprint = None
+def fingerprint():
+	global _fingerprint
+	if _fingerprint is None:
+		h = hashlib.sha256()
+		d = os.path.dirname(os.path.abspath(__file__))
+		for f in sorted(os.listdir(d)):
+			if not f.endswith('.py'):
+				continue
+			h.update(f.encode('utf-8'))
+			with open(os.path.join(d, f), 'rb') as fp:
+				h.update(fp.read())
+		_fingerprint = h.hexdigest()
+	return _fingerprint
+
+def digest(*parts):
+	h = hashlib.sha256()
+	for p in parts:
+		if isinstance(p, str):
+			p = p.encode('utf-8')
+		h.update(p)
+		h.update(b'\0')
+	return h.hexdigest()
+
+class Cache:
+	def __init__(self, name, maxentries):
+		self.dir = os.path.join(cachedir(), name)
+		self.maxentries = maxentries
+
+	def _path(self, key):
+		return os.path.join(self.dir, key)
+
+	def get(self, key):
+		p = self._path(key)
+		try:
+			with open(p, 'rb') as f:
+				data = f.read()
+			os.utime(p)
+		except OSError:
+			return None
+		return data
+
+	def put(self, key, data):
+		p = self._path(key)
+		tmp = p + '.' + str(os.getpid())
+		try:
+			os.makedirs(self.dir, exist_ok = True)
+			with open(tmp, 'wb') as f:
+				f.write(data)
+			os.replace(tmp, p)
+			self._evict()
+		except OSError:
+			try: os.unlink(tmp)
+			except OSError: pass
+
+	def _evict(self):
+		ents = []
+		with os.scandir(self.dir) as it:
+			for e in it:
+				try:
+					ents.append((e.stat().st_mtime, e.path))
+				except OSError:
+					pass
+		if len(ents) <= self.maxentries:
+			return
+		for _, p in sorted(ents)[:len(ents) - self.maxentries]:
+			try: os.unlink(p)
+			except OSError: pass
+
+	def getjson(self, key):
+		data = self.get(key)
+		if data is None:
+			return None
+		try:
+			return json.loads(data.decode('utf-8'))
+		except ValueError:
+			return None
+
+	def putjson(self, key, obj):
+		self.put(key, json.dumps(obj).encode('utf-8'))
+
+#
+# Warm-start cache for the recipe solver.  Stores the converged
+# solver state, keyed by what the solve depends on: the recipe inputs
+# and the parameters which affect the solve (see _paramphase in
+# WBC/wbc.py).  So a recipe which differs only in e.g. its name,
+# yeast, mash parameters or output units (which the output cache
+# does not catch) also hits.  A hit converges on the first pass and
+# gives exactly the same results as solving from scratch (see
+# Recipe.seed_solver() for why the solve inputs must be the same).
+#
+# Usage:
+#	ws = WarmStart(recipe)		# before calculate()
+#	ws.seed()
+#	recipe.calculate()
+#	ws.store()
+#
+class WarmStart:
+	def __init__(self, recipe):
+		from WBC import sysparams, fermcatalog
+		from WBC.wbc import solveparam
+
+		self.recipe = recipe
+		self.cache = Cache('warmstart', 1000)
+
+		# computed before calculate(), which modifies the
+		# additions we compute the key from
+		with recipe.ctx:
+			pi = sysparams.getparaminputs()
+			params = '|'.join([x + '=' + pi[x]
+			    for x in sorted(pi) if solveparam(x)])
+			self.key = digest(fingerprint(), params,
+			    recipe.input_digest(), *fermcatalog.catalogstamp())
+
+	# returns True if there was a state to seed the solver with
+	def seed(self):
+		st = self.cache.getjson(self.key)
+		if st is None:
+			return False
+		self.recipe.seed_solver(st)
+		return True
+
+	def store(self):
+		self.cache.putjson(self.key, self.recipe.solver_state())
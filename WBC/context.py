@@ -0,0 +1,94 @@
+#
+# Copyright (c) 2026 Antti Kantee <pooka@iki.fi>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+#
+# Calculation context.  Holds what used to be module globals: the
+# system parameters, the boil time of the recipe, the sink for
+# warnings and notices, and the text output being built.
+#
+# There is always a current context.  Unless something else is
+# activated, it is the process-wide default context, so programs
+# calculating one recipe at a time need not care about any of this.
+# To calculate several recipes with different parameters, possibly
+# concurrently in threads, give each one its own context:
+#
+#	ctx = Context(diag = io.StringIO())
+#	with ctx:
+#		sysparams.setparam('mash_efficiency', '80%')
+#		r = Recipe()
+#		...
+#		r.calculate()
+#
+# A new context starts out as a copy of the current one.  A Recipe
+# remembers the context it was created in and activates it for
+# calculate() and friends, so the recipe itself can be passed
+# around freely.  Contexts are activated per thread.
+#
+# NOTE: this module may not import other WBC modules, it is
+# imported by pretty much all of them.
+#
+
+import sys
+import threading
+
+class Context:
+	def __init__(self, parent = None, diag = None):
+		if parent is None:
+			parent = current()
+		self.params = dict(parent.params)
+		self.paraminputs = dict(parent.paraminputs)
+		self.boiltime = None
+
+		# anything with a write() method, None means stderr
+		self.diag = diag
+
+		# sections of text output, see output_text
+		self.prtsects = ['']
+
+	def write(self, msg):
+		(self.diag or sys.stderr).write(msg)
+
+	def __enter__(self):
+		_stack().append(self)
+		return self
+
+	def __exit__(self, *args):
+		rv = _stack().pop()
+		assert(rv is self)
+
+_tls = threading.local()
+def _stack():
+	if not hasattr(_tls, 'stack'):
+		_tls.stack = []
+	return _tls.stack
+
+def current():
+	st = _stack()
+	if len(st) > 0:
+		return st[-1]
+	return _default
+
+def default():
+	return _default
+
+# the default context is not a copy of anything.  sysparams
+# fills in the default parameters when it is imported.
+_default = Context.__new__(Context)
+_default.params = {}
+_default.paraminputs = {}
+_default.boiltime = None
+_default.diag = None
+_default.prtsects = ['']
@@ -0,0 +1,303 @@
+#
+# Copyright (c) 2026 Antti Kantee <pooka@iki.fi>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+#
+# wbcd, the resident WBC daemon.  Most of the time of running a wbc*
+# tool goes into starting Python and importing WBC (+ yaml).  wbcd
+# does that once, and then runs the tools on behalf of clients.
+#
+# The tools call forward() first thing.  If wbcd is running, the
+# client passes its stdin/stdout/stderr, arguments, environment and
+# working directory over a Unix socket, and exits with the exit status
+# it gets back.  If wbcd is not running, or is running a different
+# version of WBC, forward() returns and the tool runs normally.
+#
+# The daemon forks a child for each request.  The child inherits
+# everything already imported, plugs in the client's file descriptors
+# and runs the tool as if it were started from the command line.
+# Nothing a tool does (e.g. setting system parameters) can leak into
+# later requests.
+#
+# This module is imported by the tools before anything else, so
+# keep the imports cheap.  The client side uses only os, sys and the
+# low-level _socket: importing json, socket and struct made a request
+# take about 15ms longer, a quarter of the whole round trip.
+#
+# The request is the script path, working directory, arguments and
+# environment as one block of NUL-separated strings, preceded by the
+# length of the block and the number of arguments.  The client's
+# stdin, stdout and stderr come along as SCM_RIGHTS.  The reply is
+# the exit status, or -1 if the daemon refuses the request.
+#
+
+import os
+import sys
+
+# set in the child serving a request, so that the tool
+# does not try to forward the request back to us
+_served = False
+
+def socketpath():
+	p = os.environ.get('WBC_SOCKET')
+	if p is None:
+		d = os.environ.get('XDG_RUNTIME_DIR')
+		if d is None:
+			d = os.path.join(os.environ.get('XDG_CACHE_HOME',
+			    os.path.expanduser('~/.cache')), 'wbc')
+		p = os.path.join(d, 'wbcd.sock')
+	return p
+
+def _int(n):
+	return n.to_bytes(4, 'big', signed = True)
+
+def _recvall(s, n):
+	data = b''
+	while len(data) < n:
+		v = s.recv(n - len(data))
+		if len(v) == 0:
+			raise EOFError('short read')
+		data += v
+	return data
+
+#
+# client side
+#
+
+def forward():
+	if _served or os.environ.get('WBC_NODAEMON'):
+		return
+
+	import _socket
+
+	s = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+	try:
+		s.connect(socketpath())
+	except OSError:
+		s.close()
+		return
+
+	req = b'\0'.join([os.fsencode(os.path.realpath(sys.argv[0])),
+	    os.getcwdb()] + [os.fsencode(x) for x in sys.argv]
+	    + [k + b'=' + v for k, v in os.environb.items()])
+	fds = b''.join([x.to_bytes(4, sys.byteorder) for x in [0, 1, 2]])
+	try:
+		s.sendmsg([_int(len(req)) + _int(len(sys.argv)) + req],
+		    [(_socket.SOL_SOCKET, _socket.SCM_RIGHTS, fds)])
+	except OSError:
+		s.close()
+		return
+
+	# from here on the tool may be running in the daemon, so
+	# we can't fall back to running it ourselves
+	try:
+		rv = int.from_bytes(_recvall(s, 4), 'big', signed = True)
+	except (OSError, EOFError):
+		sys.stderr.write('wbcd: lost connection to daemon\n')
+		sys.exit(1)
+	s.close()
+
+	# daemon refused (e.g. different WBC version), do it ourselves
+	if rv < 0:
+		return
+	sys.exit(rv)
+
+#
+# daemon side
+#
+
+# files which, if changed, make us obsolete
+def _sources(bindir):
+	d = os.path.dirname(os.path.abspath(__file__))
+	return [os.path.join(d, x) for x in sorted(os.listdir(d))
+	    if x.endswith('.py')] + list(_scripts(bindir))
+
+def _scripts(bindir):
+	for x in sorted(os.listdir(bindir)):
+		p = os.path.join(bindir, x)
+		if not x.startswith('wbc') or x == 'wbcd' \
+		    or not os.path.isfile(p):
+			continue
+		with open(p, 'rb') as f:
+			if f.readline().rstrip().endswith(b'python3'):
+				yield p
+
+def _srcstamp(files):
+	try:
+		return [os.stat(x).st_mtime for x in files]
+	except OSError:
+		return None
+
+def _preload(bindir):
+	from WBC import wbc, recipefile, output_text, cache
+	from WBC import sysparams, parse, brewutils, fermentables
+	from WBC import fermcatalog
+	import yaml
+	# the tools parse their options with getopt, which drags in
+	# gettext.  not much, but every request paid for it.
+	import getopt
+
+	cache.fingerprint()
+
+	# only the built-in fermentables.  which catalog files the
+	# user has depends on the environment and working directory
+	# of the request, so the child serving a request loads them
+	# (see fermentables._load()).  they are compiled and mmapped,
+	# so that is quick.
+	fermentables._load(catalogs = False)
+
+	code = {}
+	for p in _scripts(bindir):
+		with open(p, 'r', encoding='utf-8') as f:
+			code[os.path.realpath(p)] = compile(f.read(),
+			    p, 'exec')
+	return code
+
+def _reply(s, rv):
+	try:
+		s.sendall(_int(rv))
+	except OSError:
+		pass
+
+def _runscript(s, scripts):
+	global _served
+	_served = True
+
+	import socket
+
+	msg, fds, _, _ = socket.recv_fds(s, 65536, 3)
+	if len(msg) < 8 or len(fds) != 3:
+		return
+	n, argc = [int.from_bytes(msg[i:i+4], 'big') for i in [0, 4]]
+	msg = msg[8:]
+	if len(msg) < n:
+		msg += _recvall(s, n - len(msg))
+	v = msg.split(b'\0')
+	req = {
+		'script'	: os.fsdecode(v[0]),
+		'cwd'		: os.fsdecode(v[1]),
+		'argv'		: [os.fsdecode(x) for x in v[2:2+argc]],
+		'env'		: dict([x.split(b'=', 1)
+				    for x in v[2+argc:]]),
+	}
+
+	if req['script'] not in scripts:
+		_reply(s, -1)
+		return
+
+	for i, fd in enumerate(fds):
+		os.dup2(fd, i)
+		os.close(fd)
+	sys.stdin = open(0, 'r', closefd = False)
+	sys.stdout = open(1, 'w', closefd = False)
+	sys.stderr = open(2, 'w', closefd = False)
+
+	os.chdir(req['cwd'])
+	os.environ.clear()
+	os.environb.update(req['env'])
+	sys.argv = req['argv']
+
+	rv = 0
+	try:
+		exec(scripts[req['script']], {
+			'__name__'	: '__main__',
+			'__file__'	: req['script'],
+		})
+	except SystemExit as e:
+		if e.code is None:
+			rv = 0
+		elif isinstance(e.code, int):
+			rv = e.code
+		else:
+			sys.stderr.write(str(e.code) + '\n')
+			rv = 1
+	except BaseException:
+		import traceback
+		traceback.print_exc()
+		rv = 1
+
+	for f in [sys.stdout, sys.stderr]:
+		try: f.flush()
+		except OSError: pass
+	_reply(s, rv & 0xff)
+
+# serve until killed.  if the WBC sources change, restart ourselves
+# so that clients never get output from stale code.
+def serve(bindir, path = None):
+	from WBC.utils import PilotError, notice
+	import signal
+	import socket
+
+	if path is None:
+		path = socketpath()
+
+	s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	try:
+		s.connect(path)
+		s.close()
+		raise PilotError('wbcd already running on ' + path)
+	except OSError:
+		pass
+	try: os.unlink(path)
+	except OSError: pass
+
+	scripts = _preload(bindir)
+	files = _sources(bindir)
+	stamp = _srcstamp(files)
+
+	d = os.path.dirname(path)
+	if d:
+		os.makedirs(d, mode = 0o700, exist_ok = True)
+	s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	omask = os.umask(0o077)
+	s.bind(path)
+	os.umask(omask)
+	s.listen(64)
+	notice('wbcd serving ' + str(len(scripts)) + ' tools on '
+	    + path + '\n')
+
+	# we don't care about the children, let the kernel reap them
+	signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+	# clean up the socket also when killed
+	signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+
+	try:
+		_serve(s, path, scripts, files, stamp)
+	finally:
+		try: os.unlink(path)
+		except OSError: pass
+
+def _serve(s, path, scripts, files, stamp):
+	from WBC.utils import notice
+	import signal
+
+	while True:
+		c, _ = s.accept()
+		if _srcstamp(files) != stamp:
+			_reply(c, -1)
+			c.close()
+			s.close()
+			os.unlink(path)
+			notice('WBC sources changed, restarting\n')
+			os.execv(sys.executable, [sys.executable] + sys.argv)
+
+		if os.fork() == 0:
+			signal.signal(signal.SIGTERM, signal.SIG_DFL)
+			s.close()
+			try:
+				_runscript(c, scripts)
+			finally:
+				os._exit(0)
+		c.close()
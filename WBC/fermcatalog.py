@@ -0,0 +1,269 @@
+#
+# Copyright (c) 2026 Antti Kantee <pooka@iki.fi>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+#
+# Fermentable catalog files, for adding fermentables without touching
+# the code.  The catalogs are read from the files listed in
+# $WBC_FERMENTABLES (colon-separated), or by default from
+# ~/.wbcfermentables and ./.wbcfermentables.  Entries override
+# built-in fermentables of the same name.
+#
+# The format is one fermentable per line:
+#
+#   maltster|product|extract|type|fcd|moisture|color[|noconversion]
+#
+#   Weyermann|Pale|81%|FGDB|1.5|4.5|6.5EBC
+#   -|Honey|83%|CGAI|-|17|10L|noconversion
+#   -|Apple juice|12degP|liquid|-|-|10L|noconversion
+#
+# "-" is no maltster or an unknown fine-coarse difference.  type is one
+# of CGDB, FGDB, CGAI, FGAI (see Solid in fermentables) or liquid, in
+# which case extract is the strength and moisture is not used.
+#
+# Parsing the text is slow for large catalogs, so "wbcfermfind -r"
+# compiles each file into the cache directory.  The compiled file is
+# mmapped, with the numbers in arrays and the names in one string
+# table, so loading it is quick and processes share the pages.
+# Fermentable objects are created only for entries which are used.
+# If the source has changed since it was compiled, it is parsed
+# instead, with a notice.
+#
+
+import array
+import math
+import mmap
+import os
+import struct
+import sys
+
+from WBC.utils import PilotError, notice
+
+_types = ['CGDB', 'FGDB', 'CGAI', 'FGAI', 'liquid']
+_LIQUID = 4
+_NOCONVERSION = 0x80
+
+# magic, number of entries, length of the string table, and the
+# mtime and size of the source, for checking if we are up to date
+_header = struct.Struct('=8sIIqq')
+_magic = b'WBCFCAT' + sys.byteorder[0].encode('ascii')
+
+def catalogfiles():
+	v = os.environ.get('WBC_FERMENTABLES')
+	if v is not None:
+		return [x for x in v.split(':') if len(x) > 0]
+	return [x for x in [os.path.expanduser('~/.wbcfermentables'),
+	    './.wbcfermentables'] if os.path.exists(x)]
+
+# The catalog files with their modification times and sizes, for the
+# keys of cached results which depend on what is in the catalogs.
+def catalogstamp():
+	res = []
+	for src in catalogfiles():
+		try:
+			st = os.stat(src)
+		except OSError:
+			res.append(src)
+			continue
+		res.append('{:s}|{:d}|{:d}'.format(os.path.realpath(src),
+		    st.st_mtime_ns, st.st_size))
+	return res
+
+def compiledpath(src):
+	from WBC import cache
+
+	return os.path.join(cache.cachedir(), 'catalog',
+	    cache.digest(os.path.realpath(src)))
+
+#
+# a catalog is a list of rows:
+#   (maltster, product, extract, fcd, moisture, color, flags)
+# with the numbers as floats (fcd = nan if unknown, color in EBC) and
+# flags = type | _NOCONVERSION
+#
+
+def _parseline(line):
+	from WBC import parse
+
+	v = [x.strip() for x in line.split('|')]
+	flags = 0
+	if len(v) == 8:
+		if v.pop() != 'noconversion':
+			raise PilotError('last field must be "noconversion"')
+		flags |= _NOCONVERSION
+	if len(v) != 7:
+		raise PilotError('expected 7 or 8 fields')
+	maltster, product, extract, type, fcd, moisture, color = v
+
+	if type not in _types:
+		raise PilotError('invalid type: ' + type)
+	t = _types.index(type)
+	flags |= t
+	if t == _LIQUID:
+		extract = float(parse.strength(extract))
+		fcd = moisture = math.nan
+	else:
+		extract = parse.percent(extract)
+		fcd = math.nan if fcd == '-' else float(fcd)
+		moisture = float(moisture)
+	row = (None if maltster == '-' else maltster, product,
+	    extract, fcd, moisture, float(parse.color(color)), flags)
+
+	# catch errors now instead of when the fermentable is used
+	_mkfermentable(row)
+	return row
+
+def parsesource(src):
+	rows = []
+	with open(src, 'r', encoding='utf-8') as f:
+		for n, line in enumerate(f, 1):
+			line = line.strip()
+			if len(line) == 0 or line[0] == '#':
+				continue
+			try:
+				rows.append(_parseline(line))
+			except (PilotError, ValueError) as e:
+				raise PilotError(src + ':' + str(n) + ': '
+				    + str(e))
+	return rows
+
+def _mkfermentable(row):
+	from WBC.fermentables import Fermentable, Solid, Liquid
+	from WBC.units import Color, Strength
+
+	maltster, product, extract, fcd, moisture, color, flags = row
+	t = flags & ~_NOCONVERSION
+	if t == _LIQUID:
+		ext = Liquid(Strength(extract, Strength.PLATO))
+	else:
+		if math.isnan(fcd):
+			fcd = Solid.FCD_UNKNOWN
+		ext = Solid(extract, [Solid.CGDB, Solid.FGDB,
+		    Solid.CGAI, Solid.FGAI][t], fcd, moisture)
+	return Fermentable(maltster, product, ext, Color(color, Color.EBC),
+	    not flags & _NOCONVERSION)
+
+def compilecatalog(src, dst):
+	st = os.stat(src)
+	rows = parsesource(src)
+	names = '\n'.join([(x[0] or '') + '\n' + x[1]
+	    for x in rows]).encode('utf-8')
+
+	data = [_header.pack(_magic, len(rows), len(names),
+	    st.st_mtime_ns, st.st_size)]
+	for i in range(2, 6):
+		data.append(array.array('d', [x[i] for x in rows]).tobytes())
+	data.append(bytes([x[6] for x in rows]))
+	data.append(names)
+
+	os.makedirs(os.path.dirname(dst), exist_ok = True)
+	tmp = dst + '.' + str(os.getpid())
+	with open(tmp, 'wb') as f:
+		f.write(b''.join(data))
+	os.replace(tmp, dst)
+	return len(rows)
+
+#
+# The sources of entries for fermentables.Catalog.addstore().
+#
+
+class _Store:
+	# returns the lists of maltsters, products and full names
+	def names(self):
+		ms, ps = self._names()
+		return ms, ps, [m + ' ' + p if m is not None else p
+		    for m, p in zip(ms, ps)]
+
+	def fermentable(self, i):
+		return _mkfermentable(self._row(i))
+
+class SourceStore(_Store):
+	def __init__(self, src):
+		self.rows = parsesource(src)
+
+	def _names(self):
+		return [x[0] for x in self.rows], [x[1] for x in self.rows]
+
+	def _row(self, i):
+		return self.rows[i]
+
+class CompiledStore(_Store):
+	# raises ValueError if the file is not the compiled version
+	# of the source (as it is now)
+	def __init__(self, path, srcstat):
+		with open(path, 'rb') as f:
+			self.mm = mmap.mmap(f.fileno(), 0,
+			    access = mmap.ACCESS_READ)
+		if len(self.mm) < _header.size:
+			raise ValueError('truncated')
+		magic, n, nlen, mtime, size = _header.unpack_from(self.mm)
+		if magic != _magic or len(self.mm) != _header.size + 33*n+nlen:
+			raise ValueError('invalid file')
+		if (mtime, size) != (srcstat.st_mtime_ns, srcstat.st_size):
+			raise ValueError('stale')
+
+		mv = memoryview(self.mm)
+		off = _header.size
+		self.cols = []
+		for i in range(4):
+			self.cols.append(mv[off:off + 8*n].cast('d'))
+			off += 8*n
+		self.flags = mv[off:off + n]
+		off += n
+		self.strtab = bytes(mv[off:off + nlen]).decode('utf-8') \
+		    .split('\n') if n > 0 else []
+
+	def _names(self):
+		return [x or None for x in self.strtab[0::2]], \
+		    self.strtab[1::2]
+
+	def _row(self, i):
+		return (self.strtab[2*i] or None, self.strtab[2*i+1]) \
+		    + tuple([x[i] for x in self.cols]) + (self.flags[i],)
+
+def fresh(src):
+	try:
+		CompiledStore(compiledpath(src), os.stat(src))
+		return True
+	except (OSError, ValueError):
+		return False
+
+def loadall():
+	res = []
+	for src in catalogfiles():
+		try:
+			st = os.stat(src)
+		except OSError:
+			raise PilotError('cannot open fermentable catalog: '
+			    + src)
+		try:
+			res.append(CompiledStore(compiledpath(src), st))
+			continue
+		except (OSError, ValueError):
+			pass
+		notice('fermentable catalog "' + src + '" is not compiled, '
+		    'run "wbcfermfind -r"\n')
+		res.append(SourceStore(src))
+	return res
+
+# compile the catalogs which are out of date, or all if force.
+# returns a list of (source, number of entries)
+def rebuild(force = False):
+	res = []
+	for src in catalogfiles():
+		if force or not fresh(src):
+			n = compilecatalog(src, compiledpath(src))
+			res.append((src, n))
+	return res
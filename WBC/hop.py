@@ -84,7 +84,8 @@ class Hop:
 	# whirlpool hops or dryhopping.
 	#
 	def __util(self, strength, time):
-		if timespec._boiltime is None:
+		boiltime = timespec.get_boiltime()
+		if boiltime is None:
 			return 0
 
 		# account for anything that might qualify as first-wort
@@ -104,7 +105,7 @@ class Hop:
 
 		if isinstance(time, timespec.Mash) \
 		    or isinstance(time, timespec.MashSpecial):
-			mins = timespec._boiltime + FWH_BONUS
+			mins = boiltime + FWH_BONUS
 
 		elif isinstance(time, timespec.Boil):
 			mins = time.spec
@@ -129,14 +130,16 @@ class Hop:
 		return bonusmap[self.type] * bignessfact * boilfact
 
 	def mass2IBU(self, strength, volume, time, mass):
-		checktypes([(strength, Strength), (mass, Mass)])
+		if __debug__:
+			checktypes([(strength, Strength), (mass, Mass)])
 
 		util = self.__util(strength, time)
 		v = util * self.aa * mass.valueas(Mass.MG) / volume
 		return v
 
 	def IBU2mass(self, strength, volume, time, IBU):
-		checktype(strength, Strength)
+		if __debug__:
+			checktype(strength, Strength)
 
 		util = self.__util(strength, time)
 
@@ -152,7 +155,8 @@ class Hop:
 		return m
 
 	def absorption(self, mass):
-		checktype(mass, Mass)
+		if __debug__:
+			checktype(mass, Mass)
 
 		# use pellethop absorption also for wet hops.  they
 		# don't technically absorb anything, but they adsorb
@@ -169,7 +173,8 @@ class Hop:
 		return v
 
 	def volume(self, mass):
-		checktype(mass, Mass)
+		if __debug__:
+			checktype(mass, Mass)
 		if self.type != self.LEAF:
 			density = constants.pellethop_density_gl
 		else:
@@ -219,6 +219,11 @@ class Mash:
 		def heat(self, target_temp):
 			self._setvalues(0, target_temp)
 
+		# the state after mashing in water_capa of water at
+		# target_temp, without calculating the strike temperature
+		def mashedin(self, target_temp, water_capa):
+			self._setvalues(water_capa, target_temp)
+
 	def __init__(self):
 		self.didmash = False
 
@@ -228,10 +233,14 @@ class Mash:
 		self.defaultmethod = MashStep.INFUSION
 
 		self._preprocd = False
+		self._watermapmemo = None
+		self._stepsmemo = None
 
+	# may be called multiple times (recipe recalculation),
+	# only the first one counts
 	def preprocess(self):
 		if self._preprocd:
-			raise PilotError('can preprocess mash only once')
+			return
 
 		# no mash steps?  Nothing more to do here
 		if self.giant_steps is None:
@@ -249,6 +258,7 @@ class Mash:
 	# mashing returns a dict which contains:
 	#  * mashstep_water
 	#  * sparge_water
+	#  * mashvol_peak: the largest mash volume of all steps
 	#  * [steps]:
 	def do_mash(self, ambient_temp, water, grains_absorb):
 		if self.giant_steps is None:
@@ -257,66 +267,38 @@ class Mash:
 		if not self._preprocd:
 			raise PilotError('mash not preprocessed')
 
-		steps = self.giant_steps
-
 		if len(self.fermentables) == 0:
 			raise PilotError('trying to mash without fermentables')
 		fmass = _Mass(sum(x.get_amount() for x in self.fermentables))
 		grainvol = self.__grainvol(fmass)
 
-		# Calculate the amount of water, going either forwards
-		# or backwards.  See usage examples below to understand
-		# why it's needed.  (forwards means start from mashin
-		# and calculate how much water we have at the end when
-		# all additions are losses are accounted for.  backwards
-		# means starting from the end, and figuring out how
-		# much strike water we need)
-		#
-		# XXX: this routine is very similar to do_steps().  Could
-		# they be merged with reasonably ?
-		MASHDIR_BACK = -1
-		MASHDIR_FWD = 1
-		def water_otherend(dir, startwater):
-			# To get a mashstate, first do the strike,
-			# either using the initial or final temperature.
-			fsnum = min(0, dir)
-			fs = steps[fsnum]
-			ms = self.__MashState(fmass, ambient_temp, ambient_temp)
-			ms.strike(fs.temperature, startwater)
-
-			# Then actually calculate the amount of water at
-			# the other end.
-			#
-			# If we are going forwards, we go from steps
-			# 1 to the last.  If we're going backwards,
-			# we go from the penultimate step (-2) to the
-			# first.  Also, if we're going backwards, we
-			# need to use the method of the *previous*
-			# step.
-			method = fs.method
-			for s in steps[fsnum+dir::dir]:
-				if dir > 0: method = s.method
-				if method == s.HEAT:
-					ms.heat(s.temperature)
-				elif method == s.INFUSION:
-					mw = ms.infusion(s.temperature)
-					startwater -= dir * mw
-				elif method == s.DECOCTION:
-					evap = self.__decoction_evaporation(s)
-					evap *= dir
-					ms.decoction(s.temperature, evap)
-					startwater -= evap
-				else:
-					assert(False)
-				if dir < 0: method = s.method
-			return startwater
+		# The amount of water at the end of the mash as a function
+		# of the strike water, and the other way around.  See usage
+		# examples below to understand why it's needed.
+		maps = self._watermaps(fmass)
+		a, b, _ = maps[-1]
+		def water_end(startwater):
+			return _Mass(a * float(startwater) + b)
+		def water_start(endwater):
+			return _Mass((float(endwater) - b) / a)
+
+		# The volume of the mash at each step is linear in the
+		# strike water too, so the most strike water which keeps
+		# the mash within a volume is the smallest of the amounts
+		# which keep each of the steps within it.  (pulling a
+		# decoction only makes the mash smaller, and it comes
+		# back before the next step)
+		def water_startmax(volmax):
+			wvmax = float(volmax) - float(grainvol)
+			return _Mass(min([(wvmax / sv - sb) / sa
+			    for sa, sb, sv in maps]))
 
 		mashin_ratio = getparam('mashin_ratio')
 		if mashin_ratio[0] == '%':
 			absorb = fmass * grains_absorb
 			wmass_end = (mashin_ratio[1] / 100.0) \
 			    * (water.water() + absorb)
-			wmass = water_otherend(MASHDIR_BACK, wmass_end)
+			wmass = water_start(wmass_end)
 		else:
 			assert(mashin_ratio[0] == '/')
 			rat = mashin_ratio[1][0] * mashin_ratio[1][1]
@@ -328,55 +310,123 @@ class Mash:
 			if mwatermin > water.water():
 				mwatermin = water.water()
 			if wmass < mwatermin:
-				wmass = water_otherend(MASHDIR_BACK, mwatermin)
+				wmass = water_start(mwatermin)
 
-		# if necessary, adjust final mash volume to limit,
+		# if necessary, adjust the largest mash volume to limit,
 		# or error if we can't
-		#
-		# XXX: we should use the *largest* volume, not final volume;
-		# largest volume may be in the middle due to evaporation
-		#
 		mvolmax = getparam('mashvol_max')
-		wmass_end = water_otherend(MASHDIR_FWD, wmass)
-		mvol = grainvol + wmass_end
-		if mvolmax is not None and mvol > mvolmax:
-			veryminvol = grainvol + getparam('mlt_loss')
-			if mvolmax <= veryminvol+.1:
-				raise PilotError('cannot satisfy maximum '
-				    'mash volume. adjust param or recipe')
-			wendmax = mvolmax - grainvol
-			wmass = water_otherend(MASHDIR_BACK, wendmax)
-
-		wmass_end = water_otherend(MASHDIR_FWD, wmass)
+		if mvolmax is not None:
+			wmax = water_startmax(mvolmax)
+			if wmass > wmax:
+				veryminvol = grainvol + getparam('mlt_loss')
+				if mvolmax <= veryminvol+.1:
+					raise PilotError('cannot satisfy '
+					    'maximum mash volume. adjust '
+					    'param or recipe')
+				wmass = wmax
+
+		wmass_end = water_end(wmass)
 
 		# finally, if necessary adjust the lauter volume
-		# or error if either mash or lauter volume is beyond limit
+		# or error if either mash or lauter volume is beyond limit.
+		# the sparge is what's left after the mash, i.e. after the
+		# water at the end of it and what the decoctions boiled off,
+		# so the excess moves from the sparge to the end of the mash.
+		# the strike water for that is what the mash limit applies to.
 		lvolmax = getparam('lautervol_max')
-		lvol = (water.water() - wmass) + grainvol
+		evap = self.evaporation().water()
+		lvol = (water.water() - wmass_end - evap) + grainvol
 		if lvolmax is not None and lvol > lvolmax:
 			dl = lvol - lvolmax
 			assert(dl > 0)
-			if (mvolmax is not None \
-			      and wmass_end + dl + grainvol > mvolmax) \
-			    or wmass_end + dl > water.water():
+			wlauter = water_start(wmass_end + dl)
+			if (mvolmax is not None and wlauter > wmax) \
+			    or wmass_end + evap + dl > water.water():
 				raise PilotError('cannot satisfy mash/lauter '
 				    'max volumes, check params/recipe')
-			wmass += dl
+			wmass = wlauter
 
-		stepres = self._do_steps(_Mass(wmass), fmass,
+		stepres, mashwater = self._steps(_Mass(wmass), fmass,
 		    water.water(), ambient_temp)
 
 		w = water.water()
-		mashwater = sum([x['water'].water() for x in stepres], _Mass(0))
 
 		res = {}
 		res['steps'] = stepres
+		res['mashvol_peak'] = max([x['mashvol'] for x in stepres])
 		res['mashstep_water'] = Worter(water = mashwater)
 		res['sparge_water'] = Worter(water = w - mashwater)
 
 		self.didmash = True
 		return res
 
+	# The water in the mash at each step is an affine function of the
+	# strike water: an infusion adds water in proportion to the heat
+	# capacity of the mash, which includes the water already in it,
+	# and a decoction boils off a fixed amount.  So, two runs of
+	# __MashState, with 0kg and 1kg of strike water, give the
+	# (a, b) for water = a * strikewater + b at each step.  Along
+	# with those goes the volume of 1kg of water at the step
+	# temperature, for figuring out the mash volumes.
+	#
+	# The maps depend only on the grain mass, the steps and
+	# a couple of parameters, so they are computed once for them.
+	def _watermaps(self, fmass):
+		steps = self.giant_steps
+		key = (float(fmass),
+		    tuple((float(s.temperature), s.method) for s in steps),
+		    getparam('mlt_heatcapacity'), getparam('boiloff_perhour'))
+		if self._watermapmemo is not None \
+		    and self._watermapmemo[0] == key:
+			return self._watermapmemo[1]
+
+		def waters(startwater):
+			# the temperatures don't matter once mashed in
+			ms = self.__MashState(fmass, 0, 0)
+			ms.mashedin(steps[0].temperature, startwater)
+			res = [startwater]
+			for s in steps[1:]:
+				if s.method == s.HEAT:
+					ms.heat(s.temperature)
+				elif s.method == s.INFUSION:
+					ms.infusion(s.temperature)
+				elif s.method == s.DECOCTION:
+					evap = self.__decoction_evaporation(s)
+					ms.decoction(s.temperature, evap)
+				else:
+					assert(False)
+				res.append(ms._capa('water'))
+			return res
+
+		maps = [(w1 - w0, w0,
+		    float(Worter(water = _Mass(1)).volume(s.temperature)))
+		    for w0, w1, s in zip(waters(0.0), waters(1.0), steps)]
+		self._watermapmemo = (key, maps)
+		return maps
+
+	# The steps depend on the strike water, the grains and a few
+	# parameters, but not on the total amount of water, of which the
+	# rest goes to the sparge.  So when only the water after the mash
+	# changes (e.g. the kettle loss), and the strike water stays the
+	# same, the steps are what they were, and only the sparge changes.
+	# Returns the steps and the water added in them.
+	def _steps(self, wmass, fmass, water_available, ambient_temp):
+		key = (float(wmass), float(fmass), float(ambient_temp),
+		    tuple((float(s.temperature), s.method)
+		      for s in self.giant_steps),
+		    getparam('mlt_heatcapacity'), getparam('mlt_heat'),
+		    getparam('boiloff_perhour'))
+		if self._stepsmemo is not None \
+		    and self._stepsmemo[0] == key \
+		    and self._stepsmemo[2] <= water_available + 0.0001:
+			return self._stepsmemo[1:]
+
+		stepres = self._do_steps(wmass, fmass, water_available,
+		    ambient_temp)
+		mashwater = sum([x['water'].water() for x in stepres], _Mass(0))
+		self._stepsmemo = (key, stepres, mashwater)
+		return stepres, mashwater
+
 	def _do_steps(self, infusion_wmass, fmass, water_available,
 	    ambient_temp):
 		def _decoction(step):
@@ -503,6 +553,7 @@ class Mash:
 		mashsteps[0].method = MashStep.INFUSION
 
 		self.giant_steps = mashsteps
+		self._preprocd = False
 
 	def set_defaultmethod(self, m):
 		if m not in MashStep.valid_methods:
@@ -16,7 +16,7 @@
 
 from WBC.getparam import getparam
 
-from WBC import constants, sysparams
+from WBC import constants, context, sysparams
 from WBC import timespec
 
 # XXX: should not be needed in an ideal world
@@ -27,13 +27,13 @@ from WBC.timespec import Timespec
 
 from datetime import date
 
-global _prtsects
-_prtsects = ['']
+# output is collected in sections in the current context, and
+# printed by printit() once everything is done
 _oldprt = print
 def _newsect():
-	_prtsects.append('')
+	context.current().prtsects.append('')
 def print(x = '', end = '\n'):
-	_prtsects[-1] += x + end
+	context.current().prtsects[-1] += x + end
 
 def stras_unsystem(obj):
 	uo = getparam('units_output')
@@ -157,6 +157,10 @@ def _printmash(input, results):
 
 	_prtsep('-')
 
+	mp = results['mash']['mashvol_peak']
+	print('{:20}{:}'.format('Peak mash volume:',
+	    str(mp) + ' / ' + stras_unsystem(mp)))
+
 	mw = results['mash']['mashstep_water'].volume(__reference_temp())
 	print('{:20}{:}'.format('Mashstep water:',
 	    str(mw) + ' / ' + stras_unsystem(mw)
@@ -434,7 +438,18 @@ def _printattenuate(results):
 		print(line)
 	_prtsep()
 
-def printit(input, results, miniprint):
+# ctx is the context the recipe was calculated in (recipe.ctx),
+# default: current.  file is where the output goes, default: stdout
+def printit(input, results, miniprint, ctx = None, file = None):
+	if ctx is None:
+		ctx = context.current()
+	with ctx:
+		_printit(input, results, miniprint, file)
+
+def _printit(input, results, miniprint, file):
+	# start from scratch, we may be printing several recipes
+	prtsects = context.current().prtsects = ['']
+
 	_keystats(input, results, miniprint)
 	_prtsep()
 	ps = sysparams.getparamshorts()
@@ -461,18 +476,18 @@ def printit(input, results, miniprint):
 
 	def doprt(str):
 		nonlocal pagelines
-		_oldprt(str, end='')
+		_oldprt(str, end='', file=file)
 		pagelines += curlines(str)
 
 	pagelen = getparam('output_text-pagelen')
 	if pagelen is None: pagelen = 0
 	pagelines = 0
-	doprt(_prtsects[0])
-	for x in _prtsects[1:]:
+	doprt(prtsects[0])
+	for x in prtsects[1:]:
 		if pagelen > 0 and pagelines + curlines(x) > pagelen:
 			pagelines = 0
-			_oldprt(end='')
+			_oldprt(end='', file=file)
 		else:
-			_oldprt()
+			_oldprt(file=file)
 			pagelines += 1
 		doprt(x)
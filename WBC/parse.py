@@ -16,12 +16,13 @@
 
 from WBC import units
 from WBC.utils import PilotError, warn
-from WBC.wbc import Recipe
-from WBC.hop import Hop
-from WBC.nute import Nute
 
 from WBC import mash
 
+# NOTE: WBC.wbc (and what it pulls in) is imported only by the parsers
+# for recipe additions.  the small utilities use this module just
+# for units, and should not have to pay for importing the recipe engine
+
 import re
 import string
 
@@ -203,6 +204,38 @@ def strength(input):
 		return units.Strength(float(input), units.Strength.SG)
 	return _unit(units.Strength, suffixes, input)
 
+# parse "from..to/step" into a list of values, each parsed with fun
+# from a string such as "12.5degC".  the units of "from" and "to" must
+# match, and "step" may leave out the unit.  a single value gives
+# a list of one.
+_rangenumre = re.compile(r'^\s*([-+]?[0-9]*\.?[0-9]+)\s*(.*?)\s*$')
+def _rangenum(input):
+	m = _rangenumre.match(input)
+	if m is None:
+		raise PilotError('invalid range value: ' + input)
+	return float(m.group(1)), m.group(2)
+
+def valuerange(input, fun):
+	input = str(input).strip()
+	if '..' not in input:
+		return [fun(input)]
+
+	v = input.split('..')
+	if len(v) != 2 or '/' not in v[1]:
+		raise PilotError('invalid range, use from..to/step: ' + input)
+	v = [v[0]] + v[1].split('/')
+	if len(v) != 3:
+		raise PilotError('invalid range, use from..to/step: ' + input)
+	(lo, lunit), (hi, hunit), (step, sunit) = [_rangenum(x) for x in v]
+	if lunit != hunit or sunit not in ('', lunit):
+		raise PilotError('range units must match: ' + input)
+	if step <= 0 or hi < lo:
+		raise PilotError('invalid range: ' + input)
+
+	n = int((hi - lo) / step + 1e-9)
+	return [fun('{:g}{:s}'.format(lo + i*step, lunit))
+	    for i in range(n+1)]
+
 def split(input, splitter, i1, i2):
 	istr = str(input)
 	marr = istr.split(splitter)
@@ -256,6 +289,8 @@ def _additionunit(input, acceptable):
 	raise ValueError('additionunit mismatch')
 
 def fermentableunit(input):
+	from WBC.wbc import Recipe
+
 	try: return (Recipe.fermentable_bypercent, percent(input))
 	except ValueError: pass
 
@@ -270,6 +305,8 @@ def fermentableunit(input):
 	raise PilotError('invalid fermentable quantity: ' + str(input))
 
 def opaqueunit(input):
+	from WBC.wbc import Recipe
+
 	try: return (Recipe.opaque_byunit, _additionunit(input,
 	    [mass, volume, (mass, volume), (volume, volume)]))
 	except ValueError: pass
@@ -277,6 +314,8 @@ def opaqueunit(input):
 	raise PilotError('invalid opaque quantity: ' + str(input))
 
 def hopunit(input):
+	from WBC.wbc import Recipe
+
 	if input.startswith('AA '):
 		input = input[3:]
 		if '/' in input:
@@ -301,6 +340,8 @@ def hopunit(input):
 	raise PilotError('invalid boilhop quantity: ' + str(input))
 
 def nuteunit(input):
+	from WBC.nute import Nute
+
 	originput = input
 	input = str(input)
 
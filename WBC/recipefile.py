@@ -0,0 +1,241 @@
+#
+# Copyright (c) 2018, 2021 Antti Kantee <pooka@iki.fi>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+#
+# Reading recipes (yaml, or csv as produced by Recipe.printcsv())
+# into a Recipe object.  Used by wbcrecipe and friends.
+#
+
+from WBC.wbc import Recipe
+from WBC.hop import Hop
+from WBC.nute import Nute
+from WBC.units import Mass
+from WBC.units import _Volume
+from WBC.utils import PilotError
+from WBC import sysparams
+from WBC import parse
+from WBC import brewutils
+
+import io
+import sys
+
+def _listify(x): return x if isinstance(x, list) else [x]
+def _tuplify(x): return x if isinstance(x, tuple) else (x,)
+
+def dohop(r, hopspec, unit, timespec):
+	hoptyp = hopspec[2] if len(hopspec) > 2 else Hop.T90
+	aa = parse.percent(hopspec[1])
+	hop = Hop(hopspec[0], aa, hoptyp)
+
+	fun, amount = parse.hopunit(unit)
+	for te in _listify(timespec):
+		ts = parse.timespec(te)
+		fun(r, hop, amount, ts)
+
+def dohops(r, d_hops):
+	for h in d_hops:
+		dohop(r, *h)
+
+def donute(r, nutespec, unit, timespec):
+	nute = Nute(nutespec[0], parse.percent(nutespec[1]))
+
+	amount, flags = parse.nuteunit(unit)
+	for te in _listify(timespec):
+		ts = parse.timespec(te)
+		Recipe.nute_byunit(r, nute, amount, ts, flags)
+
+def donutes(r, d_nutes):
+	for n in d_nutes:
+		donute(r, *n)
+
+def doopaques(r, opaques):
+	def doopaque_byunit(r, opaque, input, timespec):
+		fun, amount = parse.opaqueunit(input)
+		for te in _listify(timespec):
+			ts = parse.timespec(te)
+			fun(r, opaque, amount, ts)
+
+	def doopaque_byopaque(r, opaque, input, timespec):
+		for te in _listify(timespec):
+			ts = parse.timespec(te)
+			r.opaque_byopaque(opaque, str(input), ts)
+
+	for o in opaques.pop('byunit', []):
+		doopaque_byunit(r, *o)
+	for o in opaques.pop('byopaque', []):
+		doopaque_byopaque(r, *o)
+	if len(opaques) > 0:
+		raise PilotError('invalid opaque(s): '+','.join(opaques.keys()))
+
+def dofermentables(r, ferms):
+	fermtype = None
+
+	# strength is either "maximum"
+	# OR SG / plato OR ABV% @ attenuation%
+	s = ferms.pop('strength', None)
+	if s is not None:
+		if s == 'maximum':
+			stren = Recipe.STRENGTH_MAX
+		elif isinstance(s, str) and '@' in s:
+			v = s.split('@')
+			abv = parse.percent(v[0])
+			attenpers = parse.percent(v[1])
+			stren = brewutils.solve_strength_fromabv(abv, attenpers)
+		else:
+			stren = parse.strength(s)
+		r.anchor_bystrength(stren)
+
+	for fs in ferms:
+		ts = parse.timespec(fs)
+		ffs = ferms[fs]
+		for f in ffs:
+			(fun, v) = parse.fermentableunit(ffs[f])
+			fun(r, f, v, ts)
+
+def domashparams(r, mashparams):
+	for p in mashparams:
+		value = mashparams[p]
+
+		if p == 'method':
+			m = parse.mashmethod(value)
+			r.mash.set_defaultmethod(m)
+
+		elif p == 'temperature' or p == 'temperatures':
+			if isinstance(value, str):
+				mashsteps = [parse.mashstep(value)]
+			elif isinstance(value, list):
+				mashsteps = [parse.mashstep(x) for x in value]
+			else:
+				raise PilotError('mash temperature must be '
+				    'given as a string or list of strings')
+			r.mash.set_steps(mashsteps)
+
+		else:
+			raise PilotError('unknown mash parameter: ' + str(p))
+
+def dowater(r, d_water):
+	for what, amount, when in d_water:
+		_, amount = parse.opaqueunit(amount)
+		for te in _listify(when):
+			ts = parse.timespec(te)
+			r.water_byunit(what, amount, ts)
+
+def dorecipenotes(r, v):
+	for n in _listify(v):
+		r.add_recipenote(n)
+
+def processyeast(v):
+	if isinstance(v, list):
+		if len(v) != 2 or \
+		    not (isinstance(v[0], str) and isinstance(v[1], str)):
+			raise PilotError('"yeast" should contain the name '
+			    + 'and fermentation schedule')
+		return v[0], v[1]
+	elif not isinstance(v, str):
+		raise PilotError('"yeast" needs to be a string or an array')
+	else:
+		return v, None
+
+def processyaml(r, data):
+	# importing yaml is unfathomably slow, so do it only if we need it
+	import yaml
+
+	# the libyaml loader is several times faster than the pure-Python
+	# one, which dominated the time a wbcd request spent on a recipe.
+	# same result, only the error messages read a bit differently.
+	loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+	try:
+		d = yaml.load(data, Loader = loader)
+	except yaml.parser.ParserError as e:
+		print('>> failed to parse yaml recipe:')
+		print(e)
+		sys.exit(1)
+
+	def setdef(x, parsefun, setfun):
+		v = d.get(x, None)
+		if v:
+			setfun(*_tuplify(parsefun(v)))
+			del d[x]
+
+	setdef('name', lambda x: x, r.set_name)
+	setdef('yeast', processyeast, r.set_yeast)
+	setdef('volume', parse.volume, r.set_inherent_volume)
+	setdef('boil', parse.duration, r.set_boiltime)
+
+	handlers = {
+		'mashparams'	: domashparams,
+		'fermentables'	: dofermentables,
+		'hops'		: dohops,
+		'yan'		: donutes,
+		'opaques'	: doopaques,
+		'defs'		: lambda *x: None,
+		'water'		: dowater,
+		'notes'		: dorecipenotes,
+	}
+
+	for p in d:
+		v = d[p]
+		if p in handlers:
+			handlers[p](r, v)
+		else:
+			raise PilotError('invalid recipe field: ' + p)
+
+def processcsv(r, data):
+	dataver = -1
+
+	# don't use csv, because using utf-8+csv on python2 is
+	# just too painful
+	for line in data.read().splitlines():
+		row = line.split('|')
+		if row[0][0] == "#":
+			continue
+
+		if row[0] == "wbcdata":
+			dataver = int(row[1])
+
+		if row[0] == "recipe":
+			r.set_name(row[1])
+			r.set_yeast(row[2])
+			r.set_inherent_volume(_Volume(float(row[4])))
+			if row[3] != 'None':
+				r.set_boiltime(parse.duration(row[3]))
+
+		elif row[0] == "sysparams":
+			for x in row[1:]: sysparams.processparam(x)
+
+		elif row[0] == "mash":
+			mashsteps = [parse.mashstep(x) for x in row[2:]]
+			r.mash.set_steps(mashsteps)
+
+		elif row[0] == "fermentable":
+			when = parse.timespec(row[3])
+			r.fermentable_byunit(row[1],
+			    Mass(float(row[2]), Mass.KG), when)
+
+		elif row[0] == "hop":
+			dohop(r, [row[1], row[3] + '%',
+			    row[2]], row[4] + 'kg', row[6])
+
+# read a recipe file, and any additional recipe snippets given
+# as strings (inline) or files (include) on top of it
+def load(r, filename, inline = [], include = []):
+	with io.open(filename, "r", encoding='utf-8') as data:
+		processyaml(r, data)
+	for y in inline:
+		processyaml(r, y)
+	for y in include:
+		with io.open(y, "r", encoding='utf-8') as data:
+			processyaml(r, data)
@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2026 Antti Kantee <pooka@iki.fi>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+#
+# Small-system root finder for the recipe calculation.
+#
+# The recipe solves a handful of unknowns (water, extract adjustment,
+# strength guess, hop absorption) which all depend on each other.
+# Instead of nesting a fixed-point loop for every unknown, we treat
+# them as one vector x and look for the root of r(x) = T(x) - x, where
+# T is the "one pass of the calculation" fixed-point map.
+#
+# We use Broyden's ("good") method on the inverse Jacobian.  The
+# initial inverse Jacobian is -I, which means that the first step is
+# exactly the fixed-point step.  After that, Broyden learns how
+# the unknowns couple, which is what the nested loops would spend
+# their iterations discovering.  Dimensions are tiny (<10), so
+# plain lists of lists are plenty.
+#
+
+import math
+
+class SolverError(Exception):
+	pass
+
+def _norm(v):
+	return math.sqrt(sum([x*x for x in v]))
+
+def _ident(n, diag):
+	return [[diag if i == j else 0.0 for j in range(n)] for i in range(n)]
+
+def _matvec(m, v):
+	return [sum([row[j]*v[j] for j in range(len(v))]) for row in m]
+
+def _vecmat(v, m):
+	n = len(v)
+	return [sum([v[i]*m[i][j] for i in range(n)]) for j in range(n)]
+
+# Find x so that fun(x) is done.  "fun" returns a tuple of the
+# residual vector and a boolean telling if the caller considers
+# the residual to be within tolerance (the tolerances are not
+# uniform, so we let the caller decide).  "scale" gives
+# the typical magnitude of each component, which keeps the
+# Broyden update sane when mixing kilograms and degrees Plato.
+#
+# Returns the solution and the number of evaluations of "fun".
+def broyden(fun, x0, scale, maxiter = 25):
+	n = len(x0)
+	assert(len(scale) == n)
+
+	def f(xs):
+		r, done = fun([xs[i]*scale[i] for i in range(n)])
+		return [r[i]/scale[i] for i in range(n)], done
+	def unscaled(xs):
+		return [xs[i]*scale[i] for i in range(n)]
+
+	x = [x0[i]/scale[i] for i in range(n)]
+	r, done = f(x)
+	evals = 1
+
+	H = _ident(n, -1.0)
+	while not done:
+		dx = [-v for v in _matvec(H, r)]
+
+		# damping: if the full step makes things worse, try a
+		# shorter one.  don't try too hard, since the residual
+		# is not smooth (e.g. masses are rounded to 0.1g), and
+		# a worse step is still information for the update.
+		lam = 1.0
+		while True:
+			if evals >= maxiter:
+				raise SolverError('no convergence in '
+				    + str(evals) + ' evaluations, residual '
+				    + str(unscaled(r)))
+			xn = [x[i] + lam*dx[i] for i in range(n)]
+			rn, done = f(xn)
+			evals += 1
+			if done:
+				return unscaled(xn), evals
+			if _norm(rn) < _norm(r) or lam < 0.2:
+				break
+			lam /= 2
+
+		s = [xn[i] - x[i] for i in range(n)]
+		y = [rn[i] - r[i] for i in range(n)]
+		Hy = _matvec(H, y)
+		denom = sum([s[i]*Hy[i] for i in range(n)])
+		if abs(denom) > 1e-12:
+			u = [(s[i] - Hy[i])/denom for i in range(n)]
+			sH = _vecmat(s, H)
+			for i in range(n):
+				for j in range(n):
+					H[i][j] += u[i]*sH[j]
+		else:
+			# degenerate update, start learning over
+			H = _ident(n, -1.0)
+		x, r = xn, rn
+
+	return unscaled(x), evals
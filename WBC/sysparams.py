@@ -16,18 +16,20 @@
 # OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 #
 
-from WBC.wbc import WBC
 from WBC.utils import PilotError, notice
 from WBC.getparam import getparam
 
 from WBC import constants
+from WBC import context
 from WBC import parse
 
+# the parameters live in the current context, see context.py
 def _getparam(what):
-	rv = wbcparams[what]
+	rv = context.current().params[what]
 	return rv
 
-wbcparams = {}
+def getparaminputs():
+	return context.current().paraminputs
 
 def setparam(what, value):
 	if what in paramshorts:
@@ -36,7 +38,7 @@ def setparam(what, value):
 		raise PilotError('invalid parameter: ' + what)
 	param = paramparsers[what]
 	rv = param['parser'](value)
-	wbcparams[what] = rv
+	context.current().params[what] = rv
 
 def processparam(paramstr):
 	ar = paramstr.split('=')
@@ -79,6 +81,7 @@ def processfile(filename):
 		_process(f)
 
 def checkset():
+	wbcparams = context.current().params
 	for p in paramparsers:
 		if not paramparsers[p]['optional'] and p not in wbcparams:
 			raise PilotError('missing system parameter for: ' + p)
@@ -95,7 +98,7 @@ def _addparam1(optional, name, shortname, handler, descr):
 			if '|' in arg or ':' in arg:
 				raise PilotError('__unused')
 			rv = handler(arg)
-			paraminputs[name] = arg
+			context.current().paraminputs[name] = arg
 			return rv
 		except (PilotError, ValueError):
 			raise PilotError('invalid value "' + str(arg)
@@ -137,10 +140,19 @@ def _parsemashinratio(input):
 		rv = parse.ratio(input, parse.volume, parse.mass)
 		return ('/', rv)
 
+# parses into the SG to Plato conversion function itself, so that
+# Strength does not need to look up and compare the mode for every
+# conversion, see Strength._sg_to_plato_fun()
+def _parsestrengthconversion(input):
+	from WBC.units import Strength
+	return {
+		'polynomials'	: Strength._sg_to_plato_h,
+		'invertible'	: Strength._sg_to_plato_inv,
+	}[_currystring(['polynomials', 'invertible'])(input)]
+
 def _parsefloat(input):
 	return float(input)
 
-paraminputs = {}		# longname  -> unparsed text input
 paramparsers = {}		# longname  -> param "struct"
 paramshorts = {}		# shortname -> longname
 
@@ -233,16 +245,25 @@ _addparam('mashin_ratio',	'mr',	_parsemashinratio, 'TODO (rework what this means
 _addoptparam('mashwater_min',	'mm',	parse.volume, 'TODO (I do not remember why this parameter is necessary)')
 
 _addoptparam('mashvol_max',	'mM',	parse.volume,
-					'Maximum volume for the mash.  If the '
+					'Maximum volume for the mash at any '
+					'step, at the step temperature.  If the '
 					'limit is met, less water is used for '
 					'the mash and transferred to the '
 					'sparge. Overrides "mashin_ratio" in '
-					'case of a conflict. '
+					'case of a conflict.  Hot water takes '
+					'more space, so the limit is tighter '
+					'than the same volume of water at room '
+					'temperature, and some combinations '
+					'with "lautervol_max" which used to fit '
+					'do not. '
 					'Acceptable values: volume')
 _addoptparam('lautervol_max',	'lM',	parse.volume,
 					'Maximum volume for lauter. This '
 					'parameter assumes a single-step '
 					'lauter such as a "dunk sparge". '
+					'If the limit is met, the excess '
+					'water goes to the mash instead, '
+					'within "mashvol_max". '
 					'Acceptable values: volume')
 _addoptparam('boilvol_max',	'bM',	parse.volume,
 					'Maximum volume in the boil kettle. '
@@ -252,6 +273,45 @@ _addoptparam('boilvol_max',	'bM',	parse.volume,
 					'a fermentor-stage ingredient.'
 					'Acceptable values: volume')
 
+_addoptparam('solver',		'sv',	_currystring(['fixedpoint', 'newton']),
+					'Method for solving the recipe. '
+					'"fixedpoint" iterates over each '
+					'unknown in turn, "newton" solves '
+					'water, extract and strength '
+					'simultaneously and falls '
+					'back to "fixedpoint" if it fails. '
+					'Acceptable values: '
+					'[fixedpoint, newton]. '
+					'Default: unset (= fixedpoint)')
+
+_addoptparam('solver_precision', 'sp',
+					_currystring(['absolute', 'relative']),
+					'Convergence tolerances of the solver. '
+					'"absolute" uses the same tolerances '
+					'for all batch sizes, "relative" '
+					'scales them with the batch volume '
+					'and extract, which makes large '
+					'batches converge faster. '
+					'Acceptable values: '
+					'[absolute, relative]. '
+					'Default: unset (= absolute)')
+
+_addoptparam('strength_conversion', 'sc',
+					_parsestrengthconversion,
+					'Conversion from specific gravity to '
+					'Plato. "polynomials" picks one of '
+					'three polynomials depending on the '
+					'gravity, which leaves small gaps '
+					'between them, and does not quite '
+					'invert the Plato to SG conversion. '
+					'"invertible" uses the exact inverse '
+					'of the Plato to SG conversion, '
+					'which is smooth over the whole '
+					'range. '
+					'Acceptable values: '
+					'[polynomials, invertible]. '
+					'Default: unset (= polynomials)')
+
 _addoptparam('output_text-pagelen', 'oP',	parse.uint,
 					'Page length used by text output. '
 					'Sections are started on a new '
@@ -306,14 +366,18 @@ _defaults = {
 	'strength_output'	: 'plato',
 }
 
-for p in paramparsers:
-	if paramparsers[p]['optional']: wbcparams[p] = None
-for x in _defaults:
-	setparam(x, _defaults[x])
+# set in the default context.  other contexts inherit these.
+with context.default():
+	for p in paramparsers:
+		if paramparsers[p]['optional']:
+			context.current().params[p] = None
+	for x in _defaults:
+		setparam(x, _defaults[x])
 
 # return a string instead of an array of tuples so that we can
 # maintain policy with decodeparamshorts()
 def getparamshorts():
+	paraminputs = getparaminputs()
 	out=[]
 	for sn in sorted(paramshorts):
 		n = paramshorts[sn]
@@ -21,14 +21,17 @@
 # with Worter stages, even though they are superficially similar.
 #
 
+from WBC import context
 from WBC.utils import PilotError, checktype
 from WBC.units import Temperature, _Temperature, Duration
 
-# XXX
-_boiltime = None
+# boil timespecs are relative to the boil time of the recipe
+# being processed, which is stored in the current context
 def set_boiltime(boiltime):
-	global _boiltime
-	_boiltime = boiltime
+	context.current().boiltime = boiltime
+
+def get_boiltime():
+	return context.current().boiltime
 
 class Timespec:
 	MASH=		'mash'
@@ -128,7 +131,8 @@ class Boil(Timespec):
 	BOILTIME=	'boiltime'
 
 	def __init__(self, value):
-		if _boiltime is None:
+		boiltime = get_boiltime()
+		if boiltime is None:
 			raise PilotError('boil specifier "' + str(value)
 			    + '" in a recipe without a boil')
 
@@ -137,15 +141,15 @@ class Boil(Timespec):
 			raise PilotError('invalid boiltime: ' + str(value))
 
 		if value == self.BOILTIME:
-			self.spec = _boiltime
+			self.spec = boiltime
 		else:
-			if value > _boiltime:
+			if value > boiltime:
 				raise PilotError('boiltime ('
 				    + str(value)+') > wort boiltime')
 			self.spec = value
 
 	def timespecstr(self):
-		if abs(self.spec - _boiltime) < 0.1:
+		if abs(self.spec - get_boiltime()) < 0.1:
 			return '@ boil'
 		else:
 			return str(self)
@@ -14,20 +14,54 @@
 # OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 #
 
-import fractions
 import math
 
 from WBC.utils import checktype, checktypes, PilotError, pluszero
 
 from WBC import constants
+from WBC import context
 
 from WBC.getparam import getparam
 
+# numpy is used for the batch conversions if it is installed, but
+# it's not imported until someone asks for a batch conversion
+_numpy = None
+def _np():
+	global _numpy
+	if _numpy is None:
+		try:
+			import numpy
+			_numpy = numpy
+		except ImportError:
+			_numpy = False
+	return _numpy
+
+def _where(cond, a, b):
+	return a if cond else b
+
+# Horner's scheme, coefficients from the highest power down.
+# works for floats and numpy arrays alike.  starting from zero
+# instead of coeffs[0] gives the same result without the slice.
+def _horner(coeffs, x):
+	r = 0.0
+	for c in coeffs:
+		r = r*x + c
+	return r
+
 def _checksystem(system):
 	if system != 'metric' and system != 'us':
 		raise PilotError('invalid unit system: ' + system)
 
+#
+# Units are floats in the default unit of the class (e.g. kg for Mass),
+# remembering which unit they were given in.  Millions of them are
+# created during a recipe sweep, so the internal constructors
+# (_Mass, _Volume, etc. below, and arithmetic) skip the unit
+# conversions and create the float directly.
+#
 class WBCUnit(float):
+	__slots__ = ('inputunit', 'defaultunit')
+
 	def __new__(cls, value, unit, defunit):
 		rv = super(WBCUnit, cls).__new__(cls, value)
 		rv.inputunit = unit
@@ -37,18 +71,25 @@ class WBCUnit(float):
 	def __init__(self, value, unit):
 		super(WBCUnit, self).__init__()
 
+	# value in the default unit of the class
+	@classmethod
+	def _fromdefault(cls, value):
+		rv = float.__new__(cls, value)
+		rv.inputunit = rv.defaultunit = cls._defunit
+		return rv
+
 	def __add__(self, other):
 		if self.__class__ != other.__class__:
 			return NotImplemented
-		return type(self)(float(self)+float(other), self.defaultunit)
+		return self._fromdefault(float(self)+float(other))
 
 	def __sub__(self, other):
 		if self.__class__ != other.__class__:
 			return NotImplemented
-		return type(self)(float(self)-float(other), self.defaultunit)
+		return self._fromdefault(float(self)-float(other))
 
 	def __neg__(self):
-		return type(self)(-float(self), self.defaultunit)
+		return self._fromdefault(-float(self))
 
 	def __copy__(self):
 		return type(self)(self.valueas(self.inputunit), self.inputunit)
@@ -83,6 +124,8 @@ class WBCUnit(float):
 		return [ x for x in self.scale if x not in self.metric() ]
 
 class Volume(WBCUnit):
+	__slots__ = ()
+
 	LITER		= 'L'
 	L		= LITER
 
@@ -124,6 +167,8 @@ class Volume(WBCUnit):
 		bbl : 1/(constants.literspergallon*constants.gallonsperbarrel),
 	}
 
+	_defunit	= L
+
 	def metric(self):
 		return [ self.mL, self.dL, self.L, self.hL ]
 
@@ -142,10 +187,14 @@ class Volume(WBCUnit):
 		return super().fromfundamental(self, unit)
 
 class Temperature(WBCUnit):
+	__slots__ = ()
+
 	degC	= object()
 	degF	= object()
 	K	= object()
 
+	_defunit = degC
+
 	def __new__(cls, value, unit):
 		if unit is Temperature.degF:
 			value = Temperature.FtoC(value)
@@ -200,6 +249,8 @@ class Temperature(WBCUnit):
 		return 1.8*temp + 32
 
 class Mass(WBCUnit):
+	__slots__ = ()
+
 	kg	= 'kg'
 
 	mg	= 'mg'
@@ -213,6 +264,8 @@ class Mass(WBCUnit):
 	OZ	= oz
 	LB	= lb
 
+	_defunit = KG
+
 	# multiply/divide by X to get from/to fundamental, respectively
 	scale = {
 		kg  : 1.0,
@@ -258,6 +311,8 @@ class Mass(WBCUnit):
 			# fraction is max 1/16th and always a power of
 			# two.... because it's logical, I guess
 			#
+			import fractions
+
 			v = abs(self.valueas(self.LB))
 			whole = int(int(16*v) / 16)
 			frac =  int(16*v) % 16
@@ -273,10 +328,14 @@ class Mass(WBCUnit):
 		return self.stras_system(getparam('units_output'))
 
 class Strength(WBCUnit):
+	__slots__ = ()
+
 	PLATO	= object()
 	SG	= object()
 	SG_PTS	= object()
 
+	_defunit = PLATO
+
 	def __new__(cls, value, unit):
 		if unit is Strength.SG_PTS:
 			value = cls.sg_to_plato(cls.from_points(value))
@@ -285,16 +344,24 @@ class Strength(WBCUnit):
 		elif unit is not Strength.PLATO:
 			raise Exception('invalid Strength unit')
 
-		# just cut things off at some point: the conversion
-		# polynomials are unlikely to work reliably, and
-		# something else "wrong" is probably happening anyway
+		cls._checkbounds(value)
+		return super(Strength, cls).__new__(cls, value, unit,
+		    Strength.PLATO)
+
+	# just cut things off at some point: the conversion
+	# polynomials are unlikely to work reliably, and
+	# something else "wrong" is probably happening anyway
+	@staticmethod
+	def _checkbounds(value):
 		if value > 42.05:
 			raise PilotError('strength ' + '{:.1f}'.format(value)
 			    + str(chr(0x00b0) + 'P')
 			    + ' out of bounds, 42 max accepted')
 
-		return super(Strength, cls).__new__(cls, value, unit,
-		    Strength.PLATO)
+	@classmethod
+	def _fromdefault(cls, value):
+		cls._checkbounds(value)
+		return super()._fromdefault(value)
 
 	# I did not trust the various ABV "magic number" formulae on the
 	# internet because they lacked explanation.  So, I did a long
@@ -333,34 +400,42 @@ class Strength(WBCUnit):
 	# tenths of a percent-unit), but we'll live with it.
 	#
 	def _attenuate(self, to, aa):
-		oe = self
-		ae = to
-		abw = 0.38726*(oe-ae) + 0.00307*(math.pow(oe-ae, 2))
-		abv = abw * to.valueas(to.SG) / 0.7907
+		# if original percentage was given, return it back
+		# (we could always calculate it, but might be off
+		# by some decimal)
+		if aa is None:
+			aa = 1 - to.valueas(to.SG_PTS)/self.valueas(self.SG_PTS)
+			aa *= 100.
+
+		res = self._attenuate_h(float(self), float(to),
+		    self.valueas(self.SG), to.valueas(to.SG))
+		res['ae'] = to
+		res['re'] = _Strength(res['re'])
+		res['aa'] = aa
+		return res
+
+	# the above with the original and apparent extract in plain degP,
+	# and their SGs.  works for floats and numpy arrays alike.
+	@staticmethod
+	def _attenuate_h(oe, ae, oe_sg, ae_sg):
+		abw = 0.38726*(oe-ae) + 0.00307*(oe-ae)**2
+		abv = abw * ae_sg / 0.7907
 
 		# calculate remaining real extract
 		#
 		# sometimes you're just really thankful for computers
 		re = 0.496815689*abw + 1.001534136*ae - 0.000591051*abw*ae \
-		    - 0.000294307*pow(ae, 2) - 0.0084747*pow(abw, 2) \
-		    + 0.000183564*pow(abw, 3) + 0.000011151*pow(ae, 3) \
-		    + 0.000002452*pow(abw, 2) * pow(ae, 2)
-		re = _Strength(re)
+		    - 0.000294307*ae**2 - 0.0084747*abw**2 \
+		    + 0.000183564*abw**3 + 0.000011151*ae**3 \
+		    + 0.000002452*abw**2 * ae**2
 
 		# calculate extracts also in g/l.  1l weighs
 		# SG kilograms, so the weight of extract in g in 1l is
 		# 1000*SG * plato/100
-		oe_gl = 10 * self * self.valueas(self.SG)
-		re_gl = 10 * re * to.valueas(to.SG)
+		oe_gl = 10 * oe * oe_sg
+		re_gl = 10 * re * ae_sg
 
-		# if original percentage was given, return it back
-		# (we could always calculate it, but might be off
-		# by some decimal)
-		if aa is None:
-			aa = 1 - ae.valueas(ae.SG_PTS)/oe.valueas(oe.SG_PTS)
-			aa *= 100.
-
-		ra = 100*(1-re/self)
+		ra = 100*(1-re/oe)
 
 		# calculate CO2 production via Balling
 		#   2.0665g extract => 1g C2H6O + 0.9565g CO2 + 0.11g solids
@@ -368,23 +443,55 @@ class Strength(WBCUnit):
 		co2_gl = (oe_gl - re_gl) * 0.9565/2.0665
 
 		return {
-			'ae': to,
+			'ae': ae,
 			're': re,
 			'oe_gl': oe_gl,
 			're_gl': re_gl,
 			'co2_gl': co2_gl,
-			'aa': aa,
 			'ra': ra,
 			'abv': abv,
 			'abw': abw,
 		}
 
+	# Also for a batch of strengths (see "Batches" below), in which
+	# case aa is either one attenuation or one for each strength,
+	# and the result is a dict of batches, with ae and re in degP.
 	def attenuate_bypercent(self, aa):
-		# use attenuation for gravity, not strength
-		fg = Strength(self.valueas(self.SG_PTS) * (1-aa/100.0),
-		    self.SG_PTS)
-
-		return self._attenuate(fg, aa)
+		if isinstance(self, Strength):
+			# use attenuation for gravity, not strength
+			fg = Strength(self.valueas(self.SG_PTS)
+			    * (1-aa/100.0), self.SG_PTS)
+			return self._attenuate(fg, aa)
+
+		p2s = Strength._p2s
+		s2p = Strength._sg_to_plato_fun()
+		def attenuate(oe, aa, where):
+			oe_sg = _horner(p2s, oe)
+			fg_pts = (oe_sg - 1) * 1000 * (1-aa/100.0)
+			ae = s2p(fg_pts/1000 + 1, where)
+			res = Strength._attenuate_h(oe, ae, oe_sg,
+			    _horner(p2s, ae))
+			res['aa'] = aa
+			return res
+
+		np = _np()
+		if np:
+			oe = np.asarray(self, dtype = float)
+			if len(oe) > 0:
+				Strength._checkbounds(oe.max())
+			return attenuate(oe, np.broadcast_to(np.asarray(aa,
+			    dtype = float), oe.shape), np.where)
+
+		import array
+		if isinstance(aa, (int, float)):
+			aa = [aa] * len(self)
+		rows = []
+		for oe, a in zip(self, aa):
+			Strength._checkbounds(oe)
+			rows.append(attenuate(oe, a, _where))
+		return dict([(k, array.array('d', [x[k] for x in rows]))
+		    for k in ['ae', 're', 'oe_gl', 're_gl', 'co2_gl',
+		      'aa', 'ra', 'abv', 'abw']])
 
 	def attenuate_bystrength(self, strength):
 		checktype(strength, Strength)
@@ -433,12 +540,16 @@ class Strength(WBCUnit):
 	# given.  So, we'll just have to live with this conversion for now.
 	# Besides, we use multiple sg_to_plato polynomials anyway, so a
 	# single one wouldn't invert them anyway.
-	@staticmethod
-	def plato_to_sg(plato):
-		return 1.0000131					 \
-		    + 0.00386777 		    * math.pow(plato, 1) \
-		    + 1.27447    * math.pow(10, -5) * math.pow(plato, 2) \
-		    + 6.34964    * math.pow(10, -8) * math.pow(plato, 3)
+	#
+	# ... unless the "strength_conversion" sysparam is set to
+	# "invertible".  Then sg_to_plato is the exact inverse of
+	# plato_to_sg, which is a single smooth, monotonic polynomial.
+	# No gaps for the iterative methods to fall into.
+	#
+	# The polynomials are evaluated in Horner form (see _horner()),
+	# coefficients from the highest power down.
+	#
+	_p2s = [6.34964e-8, 1.27447e-5, 0.00386777, 1.0000131]
 
 	# Ok, um, this is "real world".  We use three different
 	# conversion polynomials.  Each has its strengths and weaknesses.
@@ -447,47 +558,111 @@ class Strength(WBCUnit):
 	# I'm not going to worry about that for now ... though I *am* worried
 	# that some of the iterative methods used in the program might hit
 	# some gap and fail to converge.
-	@staticmethod
-	def sg_to_plato(sg):
+	_s2p = [
 		# Fourth order polynomial with constraint 1.000 = 0degP.
 		# Inaccurate at 1.005
-		if sg < 1.0020:
-			return 2737.9302			\
-			    - (11754.5873 * math.pow(sg, 1))	\
-			    + (17868.5255 * math.pow(sg, 2))	\
-			    - (11682.9897 * math.pow(sg, 3))	\
-			    + (2831.1213  * math.pow(sg, 4))
-
-		# ASBC polynomial
-		elif sg < 1.088:
-			return -1*616.868			\
-			    + (1111.14 * math.pow(sg, 1))	\
-			    - (630.272 * math.pow(sg, 2))	\
-			    + (135.997 * math.pow(sg, 3))
-
-		# The jump between the previous and this one is quite
-		# significant ...
-		else:
-			return -1*585.23918			\
-			    + (1038.82303 * math.pow(sg, 1))	\
-			    - (577.93337  * math.pow(sg, 2))	\
-			    + (124.3964   * math.pow(sg, 3))
+		[2831.1213, -11682.9897, 17868.5255, -11754.5873, 2737.9302],
+
+		# ASBC polynomial, from 1.0020
+		[135.997, -630.272, 1111.14, -616.868],
+
+		# from 1.088.  The jump between the previous and this one
+		# is quite significant ...
+		[124.3964, -577.93337, 1038.82303, -585.23918],
+	]
+
+	#
+	# Batches.  The conversions below, valueas() and
+	# attenuate_bypercent() take either one strength or a batch
+	# of them, e.g. a hydrometer log or the points of a sweep:
+	#
+	#	Strength.valueas([12.0, 13.5], Strength.SG)
+	#
+	# A batch is any sequence of floats in degP (or SG).  It is
+	# converted all at once and returned as a numpy array if numpy is
+	# installed, else one at a time and returned as an
+	# array.array('d').
+	#
+	# fun(value, where) does the conversion for a float or
+	# a numpy array.  where(cond, a, b) is numpy.where or its
+	# scalar equivalent.
+	#
+	@staticmethod
+	def _batch(fun, values):
+		if isinstance(values, (int, float)):
+			return fun(values, _where)
+		np = _np()
+		if np:
+			return fun(np.asarray(values, dtype = float),
+			    np.where)
+		import array
+		return array.array('d', [fun(x, _where) for x in values])
+
+	@staticmethod
+	def _plato_to_sg_h(plato, where):
+		return _horner(Strength._p2s, plato)
+
+	@staticmethod
+	def _sg_to_plato_h(sg, where):
+		s2p = Strength._s2p
+		if where is _where:
+			# no need to calculate all three
+			return _horner(s2p[0 if sg < 1.0020
+			    else 1 if sg < 1.088 else 2], sg)
+		return where(sg < 1.0020, _horner(s2p[0], sg),
+		    where(sg < 1.088, _horner(s2p[1], sg),
+		      _horner(s2p[2], sg)))
+
+	# invert plato_to_sg with Newton's method, starting from the
+	# regular sg_to_plato.  the starting point is within 0.1degP or
+	# so, which gets us to the last bit in three rounds.  always do
+	# the same number of rounds, so that this works for arrays too.
+	_dp2s = [3*_p2s[0], 2*_p2s[1], _p2s[2]]
+	@staticmethod
+	def _sg_to_plato_inv(sg, where):
+		p2s, dp2s = Strength._p2s, Strength._dp2s
+		plato = Strength._sg_to_plato_h(sg, where)
+		for _ in range(4):
+			plato = plato - (_horner(p2s, plato) - sg) \
+			    / _horner(dp2s, plato)
+		return plato
+
+	# the strength_conversion sysparam is parsed into the function
+	# (see sysparams), so this is only a lookup.  it is used for
+	# every conversion, so skip the getparam() wrapper.  the small
+	# utilities do not import sysparams at all, in which case the
+	# parameter is not there.
+	@staticmethod
+	def _sg_to_plato_fun():
+		return context.current().params.get('strength_conversion') \
+		    or Strength._sg_to_plato_h
+
+	@staticmethod
+	def plato_to_sg(plato):
+		return Strength._batch(Strength._plato_to_sg_h, plato)
+
+	@staticmethod
+	def sg_to_plato(sg):
+		return Strength._batch(Strength._sg_to_plato_fun(), sg)
 
 	@staticmethod
 	def to_points(sg):
-		return (sg - 1) * 1000
+		return Strength._batch(lambda x, where: (x - 1) * 1000, sg)
 
 	@staticmethod
 	def from_points(points):
-		return (points / 1000 + 1)
+		return Strength._batch(lambda x, where: x / 1000 + 1, points)
 
 	def valueas(self, which):
 		if which is Strength.SG:
-			return self.plato_to_sg(self)
+			return Strength.plato_to_sg(self)
 		elif which is Strength.SG_PTS:
-			return self.to_points(self.plato_to_sg(self))
+			return Strength._batch(lambda x, where:
+			    (_horner(Strength._p2s, x) - 1) * 1000, self)
 		elif which is Strength.PLATO:
-			return self
+			if isinstance(self, Strength):
+				return self
+			return Strength._batch(lambda x, where: x, self)
 		else:
 			raise Exception('invalid Strength type')
 
@@ -602,12 +777,16 @@ class Color(float):
 		return fmt.format(v, unit)
 
 class Pressure(WBCUnit):
+	__slots__ = ()
+
 	PASCAL		= object()
 	BAR		= object()
 	ATMOSPHERE	= object()
 	ATM		= ATMOSPHERE
 	PSI		= object()
 
+	_defunit	= PASCAL
+
 	def __new__(cls, value, unit):
 		if unit is Pressure.PSI:
 			value = value * constants.pascalsperpsi
@@ -655,9 +834,13 @@ class Pressure(WBCUnit):
 			raise PilotError('invalid pressure unit')
 
 class Duration(WBCUnit):
+	__slots__ = ()
+
 	MINUTE=		'min'
 	#HOUR=		'h'
 
+	_defunit=	MINUTE
+
 	def __new__(cls, value, unit):
 		return super(Duration, cls).__new__(cls, value,
 		    Duration.MINUTE, Duration.MINUTE)
@@ -669,49 +852,34 @@ class Duration(WBCUnit):
 # So, define internal names to avoid having to type the units every
 # time.  _Mass and _Strength use the internal value of the
 # class (KG and PLATO, respectively).
+#
+# The objects created are of the "real" class, e.g. _Mass(1) is a Mass.
 class _Volume(Volume):
+	__slots__ = ()
 	def __new__(cls, value):
-		rv = super(_Volume, cls).__new__(cls, value, Volume.LITER)
-		rv.__class__ = Volume
-		return rv
-	def __init__(self, value):
-		super(_Volume, self).__init__(value, Volume.LITER)
+		return Volume._fromdefault(value)
 
 class _Temperature(Temperature):
+	__slots__ = ()
 	def __new__(cls, value):
-		rv = super(_Temperature, cls).__new__(cls,
-		    value, Temperature.degC)
-		rv.__class__ = Temperature
-		return rv
-	def __init__(self, value):
-		super(_Temperature, self).__init__(value, Temperature.degC)
+		return Temperature._fromdefault(value)
 
 class _Mass(Mass):
+	__slots__ = ()
 	def __new__(cls, value):
-		rv = super(_Mass, cls).__new__(cls, value, Mass.KG)
-		rv.__class__ = Mass
-		return rv
-	def __init__(self, value):
-		super(_Mass, self).__init__(value, Mass.KG)
+		return Mass._fromdefault(value)
 
 class _Strength(Strength):
+	__slots__ = ()
 	def __new__(cls, value):
-		rv = super(_Strength, cls).__new__(cls,value,Strength.PLATO)
-		rv.__class__ = Strength
-		return rv
-	def __init__(self, value):
-		super(_Strength, self).__init__(value, Strength.PLATO)
+		return Strength._fromdefault(value)
 
 class _Pressure(Pressure):
+	__slots__ = ()
 	def __new__(cls, value):
-		rv = super(_Pressure, cls).__new__(cls,value,Pressure.PASCAL)
-		rv.__class__ = Pressure
-		return rv
-	def __init__(self, value):
-		super(_Pressure, self).__init__(value, Pressure.PASCAL)
+		return Pressure._fromdefault(value)
 
 class _Duration(Duration):
+	__slots__ = ()
 	def __new__(cls, value):
-		rv = super(_Duration, cls).__new__(cls, value, Duration.MINUTE)
-		rv.__class__ = Duration
-		return rv
+		return Duration._fromdefault(value)
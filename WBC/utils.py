@@ -14,11 +14,17 @@
 # OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 #
 
-import sys
+from WBC import context
 
 class PilotError(Exception):
 	pass
 
+# The type checks catch calling code passing e.g. a Volume where a
+# Mass is expected.  Functions which the recipe solver calls in its
+# inner loops do their checks under "if __debug__:", so that those
+# checks are compiled out when running with python3 -O (or
+# PYTHONOPTIMIZE=1 in the environment).  Everything else, including
+# everything that takes user input, checks unconditionally.
 def checktype(type, cls):
 	if not isinstance(type, cls):
 		raise PilotError('invalid input type for ' + cls.__name__)
@@ -43,14 +49,15 @@ def istupletype(type, clss):
 	except PilotError:
 		return False
 
+# diagnostics go to the sink of the current context (default: stderr)
 def warn(msg):
-	sys.stderr.write('WARNING: ' + msg)
+	context.current().write('WARNING: ' + msg)
 
 def notice(msg):
-	sys.stderr.write('>> ' + msg)
+	context.current().write('>> ' + msg)
 
 def diagnosticflush():
-	sys.stderr.write('\n')
+	context.current().write('\n')
 
 # used to avoid "-0" prints
 def pluszero(v):
@@ -15,7 +15,9 @@
 #
 
 import copy
+import hashlib
 import inspect
+import time
 
 from WBC import constants
 from WBC import fermentables
@@ -30,7 +32,8 @@ from WBC.nute import Nute
 from WBC.mash import Mash
 from WBC.worter import Worter, laterworter
 
-from WBC import brewutils, timespec
+from WBC import brewutils, context, solver, timespec
+from WBC.solver import SolverError
 from WBC.timespec import Timespec, Boil
 
 def checkconfig():
@@ -44,10 +47,81 @@ def _isvolumevolume(type): return istupletype(type, (Volume, Volume))
 class WBC:
 	pass
 
+#
+# Recalculation dependencies.  When calculate() is called again,
+# we check which system parameters changed since the last time,
+# and start recalculating from the earliest phase affected:
+#
+#   * solve  : fermentables, worters and hops (everything)
+#   * worters: the worters after the mash, hops and stats.  the
+#	       amount of water changes, so the worters are solved
+#	       again (from the previous solution, so it's cheap),
+#	       but the mash steps stay as they were as long as the
+#	       strike water does, and only the sparge changes (see
+#	       Mash._steps())
+#   * mash   : mash steps and water split
+#   * output : nothing, the parameter is used only for printing
+#
+# Parameters not listed here are assumed to affect the solve.
+#
+_PHASE_SOLVE, _PHASE_WORTERS, _PHASE_MASH, _PHASE_OUTPUT = range(4)
+_paramphase = {
+	'kettle_loss'		: _PHASE_WORTERS,
+	'fermentor_loss'	: _PHASE_WORTERS,
+
+	'mlt_heatcapacity'	: _PHASE_MASH,
+	'mlt_heat'		: _PHASE_MASH,
+	'ambient_temp'		: _PHASE_MASH,
+	'mashin_ratio'		: _PHASE_MASH,
+	'mashwater_min'		: _PHASE_MASH,
+	'mashvol_max'		: _PHASE_MASH,
+	'lautervol_max'		: _PHASE_MASH,
+
+	'units_output'		: _PHASE_OUTPUT,
+	'strength_output'	: _PHASE_OUTPUT,
+	'sparge_temp'		: _PHASE_OUTPUT,
+	'preboil_temp'		: _PHASE_OUTPUT,
+	'postboil_temp'		: _PHASE_OUTPUT,
+	'output_text-pagelen'	: _PHASE_OUTPUT,
+	'output_text-color'	: _PHASE_OUTPUT,
+	'recipe_datestr'	: _PHASE_OUTPUT,
+}
+
+#
+# Convergence tolerances of the solver loops.  By default
+# ("absolute" precision), they are as below regardless of the size of
+# the batch.  With "relative" precision, the volume and water
+# tolerances scale with the final volume and the extract tolerances
+# with the final extract (relative to the reference values), so that
+# a 10hl batch is not solved to the milliliter.
+#
+_tolerances = {
+	'volume'	: 0.01,		# final volume, liters
+	'watoff'	: 0.001,	# water offset for max strength, kg
+	'hops'		: 0.01,		# hop absorption, liters
+	'extract'	: 0.1,		# final extract, kg
+	'extoff'	: 0.001,	# extract offset for by-percent, kg
+}
+_tolref_volume = 20.0			# liters
+_tolref_extract = 2.5			# kg, ~20l @ 12degP
+
+# parameters do_mash() depends on, in addition to the above
+_mashparams = [x for x in _paramphase if _paramphase[x] == _PHASE_MASH] \
+    + ['mlt_loss', 'grain_absorption', 'boiloff_perhour']
+
+# True if changing the system parameter (long or short name) means
+# that the recipe must be solved again, see _paramphase
+def solveparam(name):
+	name = sysparams.paramshorts.get(name, name)
+	return _paramphase.get(name, _PHASE_SOLVE) <= _PHASE_WORTERS
+
 class Recipe:
 	STRENGTH_MAX=	"maximum"
 
 	def __init__(self):
+		# parameters, boiltime and diagnostics, see context.py
+		self.ctx = context.current()
+
 		input = {}
 		input['notes'] = {}
 		input['notes']['brewday'] = []
@@ -96,12 +170,26 @@ class Recipe:
 		self.mash = Mash()
 
 		self._oncelst = []
+		self._solvertrace = {}
+
+		# state of the previous calculate(), see _recalcphase()
+		self._calcinputs = None
+		self._ferms_orig = {}
+		self._mashmemo = None
+		self._solverrestart = False
+
+		# solver starting point from outside, see seed_solver()
+		self._solverseed = None
+
+		self._tol = _tolerances
 
 	def paramdefaults(self):
-		sysparams.processdefaults()
+		with self.ctx:
+			sysparams.processdefaults()
 
 	def paramfile(self, filename):
-		Sysparams.processfile(filename)
+		with self.ctx:
+			sysparams.processfile(filename)
 
 	THEREST=	'rest'
 
@@ -207,6 +295,50 @@ class Recipe:
 		self._oncelst.append(caller)
 		callme(*args)
 
+	#
+	# Solver tracing.  Each convergence loop gets an entry in
+	# results['solver_trace'] with the number of times the loop
+	# was entered, the total number of iterations, the residuals
+	# of each iteration and the time spent in the loop.  The time
+	# is inclusive, i.e. the outer loops count the inner ones too.
+	# Helps finding out which recipes make us work hard.
+	#
+
+	def _traceentry(self, loop):
+		return self._solvertrace.setdefault(loop, {
+			'calls'		: 0,
+			'iterations'	: 0,
+			'time'		: 0.0,
+			'residuals'	: [],
+		})
+
+	def _tracebegin(self, loop):
+		tr = self._traceentry(loop)
+		tr['calls'] += 1
+		return (tr, time.perf_counter())
+
+	def _traceend(self, handle):
+		tr, t0 = handle
+		tr['time'] += time.perf_counter() - t0
+
+	def _tracestep(self, loop, **residuals):
+		tr = self._traceentry(loop)
+		tr['iterations'] += 1
+		tr['residuals'].append({x: float(residuals[x])
+		    for x in residuals})
+
+	# available also when calculate() fails
+	def solver_trace(self):
+		return self._solvertrace
+
+	# residuals of the last iteration, for error messages
+	def _tracelast(self, loop):
+		res = self._traceentry(loop)['residuals']
+		if len(res) == 0:
+			return ''
+		return ' (' + ', '.join([x + '=' + '{:.4f}'.format(res[-1][x])
+		    for x in res[-1]]) + ')'
+
 	def _addunit(self, checkfuns, unit, fname, iswater = False):
 		rv = ([x for x in checkfuns if x(unit)] + [None])[0]
 		if rv is None:
@@ -239,7 +371,7 @@ class Recipe:
 			    + str(boiltime) + '\n')
 
 		self.boiltime = self.input['boiltime'] = boiltime
-		timespec.set_boiltime(boiltime)
+		self.ctx.boiltime = boiltime
 
 	def set_volume_and_scale(self, volume):
 		checktype(volume, Volume)
@@ -540,7 +672,7 @@ class Recipe:
 		# initial guess.  However, set it to a minimum of 11 plato
 		# to get a more realistic first guess for cases where the
 		# by-mass fermentables are just priming sugar.
-		if self._strength_max_p():
+		if self._strength_max_p() and self._strengthguess is None:
 			massfermext = _Mass(sum([self._fermentable_extract(x)
 			    for x in self._fermfilter('m')]))
 			stren = brewutils.solve_strength(massfermext,
@@ -631,90 +763,92 @@ class Recipe:
 		# AND
 		# 2) one or more "rest" grains
 		#
-		# adjust the non-rest percentages to be as specified.
-		# not sure if this could be solved analytically instead of
-		# with iteration, but, as usual, my head started hurting
-		# when thinking about it.
+		# the fixed percentages are of the mass of all
+		# fermentables, including the by-mass ones, so the
+		# "rest" grains get what's left after the by-mass
+		# and fixed percentage ones.  with T the total mass
+		# of fermentables, M the mass of the by-mass ones and
+		# P the sum of the fixed percentages (as fractions):
+		#
+		#   rest = T*(1-P) - M
+		#
+		# and the extract we need from the by-percent ones is:
+		#
+		#   extract = Yp*T + Yr*rest
+		#
+		# where Yp = sum(yieldn*pn) over the fixed percentage
+		# ones and Yr the average yield of the "rest" ones,
+		# which split the rest evenly.  That gives:
 		#
-		# we need to both reduce "rest" until the sum of the
-		# percentages is 100% (otherwise the fixed percentages
-		# are below their values), and recalculate the mass of
-		# the by-percent fermentables.
-		if (len(self._fermfilter('r')) > 0
-		    and len(self._fermfilter('p')) > 0):
-			iters = 30
-			if mext > 0.0001:
-				self._once(notice,
-				    'finding the solution for fixed '
-				    'percentages and masses\n')
-			for g in range(iters):
-				fr = self._fermfilter('r')
-				f_guess = guess(ferms)
-				fp = [x for x in f_guess if x.cookie == 'p']
-
-				# pick largest value to adjust against.
-				# gut feeling that it'll make things more
-				# accurate.  we have to pick *some* value
-				# in any case, so might as well pick this one.
-				f = sorted(fp, key=lambda x: x.get_amount(),
-				   reverse=True)[0]
-
-				f_wanted = f.info
-				allmass = self._fermentables_massof(f_guess)
-				f_actual = 100.0 * (f.get_amount() / allmass)
-				diff = f_wanted - f_actual
-				if abs(diff) < 0.01:
-					break
-				nrest = len(fr)
-
-				# scale the diff to the "rest" values we're
-				# adjusting
-				scale = (fr[0].get_amount() / f_wanted)
-				if scale < 1:
-					scale = 1/scale
-				assert(scale >= 1)
-				adj = scale * (diff / nrest)
-				for x in fr:
-					x.set_amount(x.get_amount() - adj)
-					if (x.get_amount() < 0.01):
-						raise PilotError('cannot solve '
-						    'recipe. lower bymass or '
-						    'raise strength')
-			if g == iters-1:
-				self._once(warn,
-				    'fermentable "rest" percentages did not '
-				    'converge in ' + str(iters) + ' tries\n')
+		#   T = (extract + Yr*M) / (Yp + Yr*(1-P))
+		#
+		# with T the totmass which guess() solves for, the
+		# "rest" percentages are then 100*rest/(T*number of them).
+		fr = self._fermfilter('r')
+		fp = self._fermfilter('p')
+		if len(fr) > 0 and len(fp) > 0:
+			th = self._tracebegin('rest')
+			mmass = float(self._fermentables_massof(ferms))
+			ptot = sum([x.get_amount()/100.0 for x in fp])
+			yp = sum([self._fermentable_percentage(x)/100.0
+			    * x.get_amount()/100.0 for x in fp])
+			yr = sum([self._fermentable_percentage(x)/100.0
+			    for x in fr]) / len(fr)
+			totmass = (extract + yr*mmass) / (yp + yr*(1-ptot))
+			rpercent = (100.0 * (totmass*(1-ptot) - mmass)
+			    / (len(fr) * totmass))
+			if rpercent < 0.01:
+				raise PilotError('cannot solve recipe. '
+				    'lower bymass or raise strength')
+			for x in fr:
+				x.set_amount(rpercent)
+
+			f_guess = guess(ferms)
+
+			# the masses are rounded to 0.1g, so the
+			# percentages are a hair off
+			allmass = self._fermentables_massof(f_guess)
+			self._tracestep('rest', diff=max([abs(x.info
+			    - 100.0 * (x.get_amount() / allmass))
+			    for x in f_guess if x.cookie == 'p']))
+			self._traceend(th)
 		else:
 			f_guess = guess(ferms)
 
 		self._set_calcguess(f_guess, None)
 
 
+	# crude first guess: final volume plus all losses
+	def _initial_waterguess(self):
+		vol_loss = _Volume(sum(self.vol_losses.values())
+		    + self._boiloff()
+		    + self.mash.evaporation().water())
+		fermwater = sum([self._fermentable_water(x)
+		    for x in self.fermentables], _Mass(0))
+		return _Mass(self._final_volume() + vol_loss - fermwater)
+
 	def _dofermentables_and_worters_bymass(self):
 		self._set_calcguess(self._fermfilter('m'), None)
-		vl = self.vol_losses
 
 		# With bymass, we have to guess water first,
 		# because calculation goes from start to finish.
 		# We guess once and refine it later.
 		if self.waterguess is None:
-			vol_loss = _Volume(sum(vl.values())
-			    + self._boiloff()
-			    + self.mash.evaporation().water())
-			fermwater = sum([self._fermentable_water(x)
-			    for x in self.fermentables], _Mass(0))
-			self._set_waterguess(_Mass(self._final_volume()
-			    + vol_loss - fermwater))
+			self._set_waterguess(self._initial_waterguess())
 
+		th = self._tracebegin('bymass')
 		for i in range(10):
 			res = self._doworters_bymass()
 			voldiff = _Mass(res[Worter.PACKAGE].volume()
 			    - self._final_volume())
-			if abs(voldiff) < 0.01:
+			self._tracestep('bymass', voldiff=voldiff)
+			if abs(voldiff) < self._tol['volume']:
 				break
 			self._set_waterguess(self.waterguess - voldiff)
 		else:
-			raise Exception('PANIC: recipe failed to converge')
+			raise Exception('PANIC: recipe failed to converge'
+			    + self._tracelast('bymass'))
+		self._traceend(th)
 		return res
 
 
@@ -725,9 +859,12 @@ class Recipe:
 
 		# account for "unknown" extract losses from stage to stage
 		# ("unknown" = not solved analytically)
+		th = self._tracebegin('bypercent')
 		for _ in range(30):
 			self._dofermentables_bypercent(self._fermfilter('m'))
 			extoff, watoff = self._doworters_bystrength()
+			self._tracestep('bypercent',
+			    extoff=extoff, watoff=watoff)
 
 			canbreak = True
 
@@ -735,7 +872,8 @@ class Recipe:
 			# adjust the strength guess until our starting point
 			# volume is 0.  if we're shooting for strength,
 			# adjust the amount of extract we need
-			if self._strength_max_p() and abs(watoff) >= 0.001:
+			if (self._strength_max_p()
+			    and abs(watoff) >= self._tol['watoff']):
 				# We check for and adjust the water until
 				# it matches.  If we have a positive water
 				# offset (too much water), we need to reduce
@@ -758,14 +896,16 @@ class Recipe:
 				wfin.adjust_water(-_Mass(watoff/2.0))
 				self._strengthguess = wfin.strength()
 
-			if abs(extoff) < 0.001 and canbreak:
+			if abs(extoff) < self._tol['extoff'] and canbreak:
 				break
 
 			# adjust value used in dofermentables_bypercent
 			# and try again
 			self.fermentable_extadj += extoff
 		else:
-			raise Exception('unable to calculate fermentables')
+			raise Exception('unable to calculate fermentables'
+			    + self._tracelast('bypercent'))
+		self._traceend(th)
 
 		# With by-percent we guess water last, because calculation
 		# goes from finish-to-start, and we can guess only once
@@ -882,6 +1022,19 @@ class Recipe:
 				   + 'does not exist: ' + str(ts))
 
 		mf = self._fermentables_bytimespec(Timespec.MASH)
+
+		# the mash depends only on its water, the grains and
+		# a handful of parameters.  if those are what they were
+		# the previous time, so are the results.
+		memokey = (float(mashwort.water()),
+		    tuple((x.obj.name, str(x.time), float(x.get_amount()))
+		      for x in mf),
+		    tuple(sysparams.getparaminputs().get(x)
+		      for x in _mashparams))
+		if self._mashmemo is not None and self._mashmemo[0] == memokey:
+			self.results.update(self._mashmemo[1])
+			return
+
 		self.mash.set_fermentables(mf)
 
 		# The mash worter includes the moisture from the grains,
@@ -904,7 +1057,7 @@ class Recipe:
 			fw = 100 * (extract / (extract + watermass))
 			self.results['mash_conversion'][x] = _Strength(fw)
 
-		w = copy.deepcopy(self.results['mash']['mashstep_water'])
+		w = self.results['mash']['mashstep_water'].copy()
 		w.adjust_extract(self._extract_bytimespec(Timespec.MASH))
 		w -= self.mash.evaporation()
 		rloss = (self._fermentables_massof(mf)*self._grain_absorption()
@@ -914,6 +1067,9 @@ class Recipe:
 			raise PilotError('mashin ratio ridiculously low')
 		self.results['mash_first_runnings'] = w
 
+		self._mashmemo = (memokey, {x: self.results[x] for x in
+		    ['mash', 'mash_conversion', 'mash_first_runnings']})
+
 	def _set_calcguess(self, ferms, hd):
 		if ferms is not None:
 			self.fermentables = ferms
@@ -979,7 +1135,7 @@ class Recipe:
 		ext = self._extract_bytimespec(ts)
 		w.adjust_extract(_Mass(dir*ext))
 		w.adjust_water(_Mass(dir*self._fermwater_bytimespec(ts)))
-		w_ret = copy.deepcopy(w)
+		w_ret = w.copy()
 
 		# We account for the extract loss already in the mash
 		# efficiency as returned by _extract_bytimespec()
@@ -1030,7 +1186,7 @@ class Recipe:
 			# There is no "POSTMASH" worter, hence the correct
 			# result is in "w", not the returned worter
 			_ = self._mashgrainadj_forward(w, Timespec.POSTMASH)
-			res[Worter.PREBOIL] = copy.deepcopy(w)
+			res[Worter.PREBOIL] = w.copy()
 
 			w.adjust_water(_Mass(-self._boiloff()))
 			ext = self._extract_bytimespec(Timespec.KETTLE)
@@ -1038,18 +1194,18 @@ class Recipe:
 			w.adjust_extract(ext)
 			w.adjust_water(water)
 
-			res[Worter.POSTBOIL] = copy.deepcopy(w)
+			res[Worter.POSTBOIL] = w.copy()
 
 		w.adjust_volume(-vl[Timespec.KETTLE])
 		w.adjust_extract(self._extract_bytimespec(Timespec.FERMENTOR))
 		w.adjust_water(self._fermwater_bytimespec(Timespec.FERMENTOR))
 		w.adjust_water(self._boiladj)
-		res[Worter.FERMENTOR] = copy.deepcopy(w)
+		res[Worter.FERMENTOR] = w.copy()
 
 		w.adjust_volume(-vl[Timespec.FERMENTOR])
 		w.adjust_extract(self._extract_bytimespec(Timespec.PACKAGE))
 		w.adjust_water(self._fermwater_bytimespec(Timespec.PACKAGE))
-		res[Worter.PACKAGE] = copy.deepcopy(w)
+		res[Worter.PACKAGE] = w.copy()
 
 		return res
 
@@ -1088,6 +1244,18 @@ class Recipe:
 
 		return w.extract(), w.water()
 
+	# Calculate the hop amounts and the wort absorbed by the hops.
+	# The absorbed wort is lost only after the boil, so it does not
+	# affect the postboil volume and boil gravity that the hop
+	# amounts are calculated from.  The losses also take the wort at
+	# the strength it is, so the only way back is via the package
+	# strength of a recipe BUGU, and even then only if something is
+	# added in the fermentor.  Therefore, recalculating the worters
+	# once with the new absorption is enough, and the solvers just
+	# check that the absorption stayed put on their last pass.
+	#
+	# Returns True if the absorption changed, i.e. the worters
+	# need to be recalculated.
 	def _dohops(self, w_preboil, w_postboil, w_pkg):
 		hin = self.hops_in
 		allhop = []
@@ -1102,7 +1270,7 @@ class Recipe:
 		if laterworter(self.firstworter, Worter.POSTBOIL):
 			scalefact = 1.0
 		else:
-			wrk = copy.deepcopy(w_postboil)
+			wrk = w_postboil.copy()
 			wrk.adjust_water(self._boiladj)
 			scalefact = w_postboil.volume() / wrk.volume()
 		def ibu_dilute(ibu):
@@ -1177,24 +1345,25 @@ class Recipe:
 		hopsdrunk = {x: _Volume(hd[x]) for x in hd}
 		hopsdrunk['volume'] = _Volume(packagedryhopvol)
 
-		hdold = self.hopsdrunk
-		self._set_calcguess(None, hopsdrunk)
-
-		for x in hopsdrunk:
-			v1 = hdold.get(x, 0)
-			v2 = hopsdrunk[x]
-
-			if abs(v1-v2) > 0.01:
-				# not stable, try again
-				return True
-
-		# we might not be re-called, so store calculated info
 		self.hops = allhop
 		totmass = _Mass(sum(x.get_amount() for x in allhop))
 		self.hopstats = {'mass': totmass, 'ibu' : totibus}
 
-		# result is stable
-		return False
+		hdold = self.hopsdrunk
+		self._tracestep('hops', **{x: float(hopsdrunk[x])
+		    - float(hdold.get(x, 0)) for x in hopsdrunk})
+		changed = any([abs(float(hopsdrunk[x]) - float(hdold.get(x, 0)))
+		    > self._tol['hops'] for x in hopsdrunk])
+
+		# Keep the absorption the worters were calculated with
+		# unless it changed.  That way the solver state at the
+		# end is exactly what produced the results, and a solve
+		# started from it (see seed_solver()) reproduces them.
+		if changed:
+			self._set_calcguess(None, hopsdrunk)
+		else:
+			self.hopsdrunk = dict(hopsdrunk, **hdold)
+		return changed
 
 	# calculate nutes
 	def _donutes(self, w_fermentor):
@@ -1317,6 +1486,14 @@ class Recipe:
 			res.append((x, t['ae'], t['abv']))
 		self.results['attenuation'] = res
 
+	# Hold back enough water from the boil (it gets added in the
+	# fermentor instead) to keep the preboil volume at most
+	# boilvol_max.  The held back water comes out of the preboil
+	# water only, so we can solve for it directly: the preboil
+	# worter with the same extract at exactly boilvol_max.
+	#
+	# Returns True if the adjustment changed, i.e. the worters
+	# need to be recalculated.
 	def _doboiladj(self, pbwort):
 		bvmax = getparam('boilvol_max')
 		if bvmax is None:
@@ -1324,12 +1501,317 @@ class Recipe:
 
 		boiltemp = _Temperature(100)
 		pbvol = pbwort.volume(boiltemp)
-		diff = pbvol - bvmax
-		if diff > 0:
-			adj = brewutils.water_voltemp_to_mass(diff, boiltemp)
-			self._boiladj += adj
-			return True
-		return False
+		self._tracestep('boiladj', overflow=pbvol - bvmax)
+
+		# boilvol_max is at boiling temperature, worters are
+		# set at the reference temperature
+		vol = _Volume(float(bvmax) * pbwort.volume() / pbvol)
+		w = Worter()
+		w.set_volstrength(vol,
+		    brewutils.solve_strength(pbwort.extract(), vol))
+		adj = _Mass(max(self._boiladj + pbwort.water() - w.water(), 0))
+		if abs(adj - self._boiladj) < 0.0001:
+			return False
+		self._boiladj = adj
+		return True
+
+	# package volume and extract differences to the target
+	def _finaldiffs(self, wrt):
+		voldiff = self._final_volume() - wrt[Worter.PACKAGE].volume()
+		if self._final_extract() is not None:
+			extdiff = self._final_extract() \
+			    - wrt[Worter.PACKAGE].extract()
+		else:
+			extdiff = _Mass(0)
+		return voldiff, extdiff
+
+	def _solve_fixedpoint(self):
+		# ok, so the problem is that the amount of hops affects the
+		# kettle crud, meaning we have non-constants loss between
+		# postboil and the fermentor.  that loss, in turn, affects
+		# the final volume.  we can't replace the lost wort with
+		# water, since that affects both the IBUs and strength.
+		#
+		# to summarize the dependencies
+		# hops => volume => strength => IBUs => hops
+		#
+		# of course, it's easy if we ignore fermentables-by-percent
+		# and hops-by-IBU ... but we don't
+		#
+		# trying to solve analytically gives me a headache, plus it
+		# would (probably?) lead to messy code, since we couldn't
+		# calculate each subcomponent separately anymore.  so, just
+		# do a few loops for the fermentables/mash/hops calculations,
+		# and stop when we reach <0.01l difference with desired final
+		# volume (or whatever the tolerance is, see _tolerances)
+		#
+		th = self._tracebegin('calculate')
+		for x in range(10):
+			# Calculate initial guess for worters, and
+			# especially resolve possible percentages into
+			# masses.  We use "bymass" in this loop
+			# after this call.
+			wrt = self._dofermentables_and_worters()
+
+			# if we need to adjust the boil volume, do so.
+			# the adjustment is solved directly, so one
+			# recalculation of the worters is enough.
+			if not laterworter(self.firstworter, Worter.PREBOIL):
+				bh = self._tracebegin('boiladj')
+				if self._doboiladj(wrt[Worter.PREBOIL]):
+					wrt = self._doworters_bymass()
+				self._traceend(bh)
+
+			# hops affect worters due to absorption, see
+			# _dohops() for why one recalculation is enough
+			hh = self._tracebegin('hops')
+			hopschanged = self._dohops(wrt[Worter.PREBOIL],
+			    wrt[Worter.POSTBOIL], wrt[Worter.PACKAGE])
+			if hopschanged:
+				wrt = self._doworters_bymass()
+			self._traceend(hh)
+
+			# We need to have hit *at least* the final volume.
+			# Additionally, if final strength was specified,
+			# we need to hit that too.
+			voldiff, extdiff = self._finaldiffs(wrt)
+			self._tracestep('calculate',
+			    voldiff=voldiff, extdiff=extdiff)
+			if (abs(voldiff) < self._tol['volume']
+			    and abs(extdiff) < self._tol['extract']
+			    and not hopschanged):
+				break
+			self._set_waterguess(self.waterguess + _Mass(voldiff))
+		else:
+			raise Exception('recipe failed to converge ... panic?'
+			    + self._tracelast('calculate'))
+		self._traceend(th)
+		return wrt, x+1
+
+	# The values that the calculation iterates on.  Saved so that
+	# we can restart from scratch if a solver bails out.
+	def _solverstate(self):
+		return {
+			'waterguess'	: self.waterguess,
+			'extadj'	: self.fermentable_extadj,
+			'strengthguess'	: self._strengthguess,
+			'boiladj'	: self._boiladj,
+			'hopsdrunk'	: dict(self.hopsdrunk),
+			'amounts'	: [(x, x._amount) for x in self.ferms_in],
+		}
+
+	def _setsolverstate(self, st):
+		self.waterguess = st['waterguess']
+		self.fermentable_extadj = st['extadj']
+		self._strengthguess = st['strengthguess']
+		self._boiladj = st['boiladj']
+		self.hopsdrunk = dict(st['hopsdrunk'])
+		for f, a in st['amounts']:
+			f.set_amount(a)
+
+	#
+	# Solver state exported and imported in a serializable form,
+	# so that a calculation of the same recipe can start from the
+	# solution of an earlier one.  Used by the warm-start cache
+	# in WBC.cache
+	#
+
+	def solver_state(self):
+		self._assertcalculate()
+		def f(x): return None if x is None else float(x)
+		return {
+			'waterguess'	: f(self.waterguess),
+			'extadj'	: float(self.fermentable_extadj),
+			'strengthguess'	: f(self._strengthguess),
+			'boiladj'	: float(self._boiladj),
+			'hopsdrunk'	: {x: float(self.hopsdrunk[x])
+					    for x in self.hopsdrunk},
+		}
+
+	# Seed the next solve with a state from solver_state() of a
+	# recipe with the same solve inputs: the same input_digest() and
+	# the same parameters, apart from those which do not affect the
+	# solve (see _paramphase).  The state is what the last pass of
+	# that solve was calculated from, so the first pass from it is
+	# already within the tolerances, and it gives exactly the same
+	# results.  A state from a different recipe (or volume) would
+	# converge to a slightly different point within the tolerances,
+	# i.e. the output would depend on what was solved before, so we
+	# do not accept those.
+	def seed_solver(self, state):
+		self._solverseed = state
+
+	def _applyseed(self):
+		state = self._solverseed
+		self._solverseed = None
+
+		if state['waterguess'] is not None:
+			self._set_waterguess(_Mass(state['waterguess']))
+		self.fermentable_extadj = _Mass(state['extadj'])
+		if state['strengthguess'] is not None \
+		    and self._strength_max_p():
+			self._strengthguess = _Strength(state['strengthguess'])
+		self.hopsdrunk = {x: _Volume(state['hopsdrunk'][x])
+		    for x in state['hopsdrunk']}
+		self._boiladj = _Mass(state['boiladj'])
+
+	# Describe the recipe inputs for cache keys.  Amounts are
+	# included exactly, see seed_solver() for why.
+	def input_digest(self):
+		def amount(x):
+			if isinstance(x, tuple):
+				return '/'.join([amount(y) for y in x])
+			if isinstance(x, float):
+				return repr(float(x))
+			if isinstance(x, (Hop, Nute)):
+				return x.name
+			return str(x)
+
+		# not str(), which prints temperatures in the output units
+		def when(t):
+			return t.__class__.__name__ + ':' + ','.join([x + '='
+			    + amount(v) for x, v in sorted(vars(t).items())])
+
+		def addition(a):
+			o = a.obj
+			d = [o.__class__.__name__, o.name, when(a.time),
+			    str(a.cookie)]
+			if isinstance(o, Hop):
+				d += [str(o.aa), o.type]
+			elif isinstance(o, Nute):
+				d += [str(o.yan)]
+			d += [amount(a._amount), amount(a.info)]
+			return '|'.join(d)
+
+		d = []
+		for x in ['ferms_in', 'hops_in', 'nutes_in', 'water']:
+			d += [x] + [addition(a) for a in getattr(self, x)]
+		d += ['opaques'] + [addition(a) for a in self.opaques
+		    if not isinstance(a.obj, Internal)]
+		for x in [self.hops_recipeIBUBUGU, self.nutes_recipe]:
+			if x is not None:
+				d += [k + '=' + amount(x[k]) for k in sorted(x)]
+		d += [amount(self.final_strength), amount(self.boiltime)]
+		steps = self.mash.giant_steps or []
+		d += ['mash', str(self.mash.defaultmethod)] \
+		    + [amount(x.temperature) + str(x.method) for x in steps]
+		sw = self.input['stolen_wort']
+		d += [amount(x) for x in [self.volume_inherent,
+		    self.volume_set, self.volume_scaled,
+		    float(sw.water()), float(sw.extract())]]
+
+		h = hashlib.sha256()
+		h.update('\n'.join(d).encode('utf-8'))
+		return h.hexdigest()
+
+	#
+	# Solve everything simultaneously.  Instead of the nested loops
+	# of _solve_fixedpoint(), take one pass of the calculation as
+	# a function of the unknowns:
+	#
+	#   * water     : the water guess (not for "maximum" strength)
+	#   * extract   : extract adjustment (by-percent fermentables)
+	#   * strength  : strength guess (for "maximum" strength)
+	#
+	# and feed the differences between the input and what
+	# the pass produced to the Broyden solver.  The boil volume
+	# adjustment and the hop absorption are solved within
+	# the pass, see _doboiladj() and _dohops().
+	#
+	def _solve_newton(self):
+		bypercent = len(self._fermfilter(('r', 'p'))) > 0
+		if bypercent and self.final_strength is None:
+			raise PilotError('final strength must be set for '
+			    + 'by-percent fermentables')
+
+		# get a starting point the same way as the fixed-point
+		# iteration would
+		if bypercent:
+			self._dofermentables_bypercent(self._fermfilter('m'))
+			_, watoff = self._doworters_bystrength()
+			if self.waterguess is None:
+				self._set_waterguess(watoff + self._boiladj)
+		else:
+			self._set_calcguess(self._fermfilter('m'), None)
+			if self.waterguess is None:
+				self._set_waterguess(self._initial_waterguess())
+
+		names, x0, scale = [], [], []
+		def unknown(name, value, s):
+			names.append(name)
+			x0.append(float(value))
+			scale.append(s)
+		if not self._strength_max_p():
+			unknown('water', self.waterguess, self._tol['volume'])
+		if bypercent:
+			unknown('extract', self.fermentable_extadj,
+			    self._tol['extoff'])
+		if self._strength_max_p():
+			unknown('strength', self._strengthguess, 0.01)
+
+		res = {}
+		def onepass(x):
+			v = dict(zip(names, x))
+			if 'water' in v:
+				self._set_waterguess(_Mass(v['water']))
+			if 'extract' in v:
+				self.fermentable_extadj = _Mass(v['extract'])
+			if 'strength' in v:
+				self._strengthguess = _Strength(v['strength'])
+
+			if bypercent:
+				self._dofermentables_bypercent(
+				    self._fermfilter('m'))
+				extoff, watoff = self._doworters_bystrength()
+			else:
+				self._set_calcguess(self._fermfilter('m'), None)
+				extoff = watoff = _Mass(0)
+
+			wrt = self._doworters_bymass()
+			if not laterworter(self.firstworter, Worter.PREBOIL):
+				bh = self._tracebegin('boiladj')
+				if self._doboiladj(wrt[Worter.PREBOIL]):
+					wrt = self._doworters_bymass()
+				self._traceend(bh)
+			hh = self._tracebegin('hops')
+			hopschanged = self._dohops(wrt[Worter.PREBOIL],
+			    wrt[Worter.POSTBOIL], wrt[Worter.PACKAGE])
+			if hopschanged:
+				wrt = self._doworters_bymass()
+			self._traceend(hh)
+			res['wrt'] = wrt
+
+			voldiff, extdiff = self._finaldiffs(wrt)
+			r = {}
+			r['water'] = voldiff
+			r['extract'] = extoff
+			if 'strength' in v:
+				# see _dofermentables_and_worters_bypercent()
+				# for the reasoning
+				wfin = Worter()
+				wfin.set_volstrength(self._final_volume(),
+				    self._strengthguess)
+				wfin.adjust_water(-_Mass(watoff/2.0))
+				r['strength'] = wfin.strength() - v['strength']
+
+			tol = self._tol
+			done = (abs(voldiff) < tol['volume']
+			    and abs(extdiff) < tol['extract']
+			    and abs(extoff) < tol['extoff']
+			    and not hopschanged)
+			if 'strength' in v:
+				done = done and abs(watoff) < tol['watoff']
+			self._tracestep('newton', voldiff=voldiff,
+			    extdiff=extdiff, extoff=extoff, watoff=watoff)
+			return [float(r[n]) for n in names], done
+
+		th = self._tracebegin('newton')
+		try:
+			_, evals = solver.broyden(onepass, x0, scale)
+		except SolverError as e:
+			raise SolverError(str(e) + self._tracelast('newton'))
+		self._traceend(th)
+		return res['wrt'], evals
 
 	def _checkinputs(self):
 		if self._final_volume() is None:
@@ -1347,12 +1829,149 @@ class Recipe:
 			    + "no inherent volume: "
 			    + ','.join(self.needinherent))
 
+	def _solvertolerances(self):
+		if getparam('solver_precision') != 'relative':
+			return _tolerances
+
+		vscale = max(1.0, self._final_volume() / _tolref_volume)
+		if self.final_strength is None or self._strength_max_p():
+			escale = vscale
+		else:
+			escale = max(1.0,
+			    self._final_extract() / _tolref_extract)
+
+		tol = {}
+		for x in _tolerances:
+			s = escale if x in ['extract', 'extoff'] else vscale
+			tol[x] = s * _tolerances[x]
+		return tol
+
+	# Solve the worters.  The inputs are restored to what the user
+	# gave before solving, so that this can be called repeatedly.
+	def _dosolve(self):
+		for f in self.ferms_in:
+			if f not in self._ferms_orig:
+				self._ferms_orig[f] = f._amount
+			f.set_amount(self._ferms_orig[f])
+		self._boiladj = _Mass(0)
+		if self._solverseed is not None:
+			self._applyseed()
+		self._tol = self._solvertolerances()
+
+		self._dofermentables_preprocess()
+
+		# the iterations used are in the solver trace and in
+		# results['solver'], so there is no notice for a successful
+		# solve.  falling back to fixed-point is worth a notice.
+		self._solvertrace = {}
+		if getparam('solver') == 'newton':
+			savedstate = self._solverstate()
+			try:
+				wrt, iters = self._solve_newton()
+				solverinfo = ('newton', iters)
+			except (SolverError, PilotError) as e:
+				notice('newton solver failed ('
+				    + str(e) + '), using fixed-point\n')
+				self._setsolverstate(savedstate)
+				wrt, iters = self._solve_fixedpoint()
+				solverinfo = ('fixedpoint', iters)
+		else:
+			wrt, iters = self._solve_fixedpoint()
+			solverinfo = ('fixedpoint', iters)
+		return wrt, solverinfo
+
+	# Snapshot of what went into the calculation.  Used to figure
+	# out what we need to recalculate if calculate() is called again.
+	def _inputsig(self):
+		sw = self.input['stolen_wort']
+		steps = self.mash.giant_steps or []
+		return (
+		    len(self.ferms_in), len(self.hops_in),
+		    len(self.nutes_in), len(self.water),
+		    len([x for x in self.opaques
+		      if not isinstance(x.obj, Internal)]),
+		    self.hops_recipeIBUBUGU is not None,
+		    self.nutes_recipe is not None,
+		    self.final_strength, self.boiltime,
+		    float(sw.water()), float(sw.extract()),
+		    tuple((float(x.temperature), x.method) for x in steps),
+		)
+
+	# Return the earliest phase which needs to be (re)calculated,
+	# or None if the previous results are still valid.
+	def _recalcphase(self, prevok):
+		prev = self._calcinputs
+		self._calcinputs = {
+			'sig'		: self._inputsig(),
+			'volume'	: self._final_volume(),
+			'params'	: dict(sysparams.getparaminputs()),
+		}
+		restart = self._solverrestart
+		self._solverrestart = False
+
+		# first time, recipe changed, or the previous calculation
+		# failed.  start from scratch.
+		if not prevok or prev is None \
+		    or prev['sig'] != self._calcinputs['sig']:
+			self._resetsolver()
+			return _PHASE_SOLVE
+
+		# volume changed.  scale the previous solution to
+		# the new volume and use it as the starting point.
+		ratio = self._calcinputs['volume'] / prev['volume']
+		if abs(ratio - 1.0) > .000001:
+			if restart:
+				self._resetsolver()
+				return _PHASE_SOLVE
+			if self.waterguess is not None:
+				self._set_waterguess(_Mass(ratio
+				    * self.waterguess))
+			self.fermentable_extadj = _Mass(ratio
+			    * self.fermentable_extadj)
+			self.hopsdrunk = {x: _Volume(ratio * self.hopsdrunk[x])
+			    for x in self.hopsdrunk}
+			return _PHASE_SOLVE
+
+		pp, cp = prev['params'], self._calcinputs['params']
+		changed = [x for x in set(pp) | set(cp)
+		    if pp.get(x) != cp.get(x)]
+		if len(changed) == 0:
+			return None
+		phase = min([_paramphase.get(x, _PHASE_SOLVE)
+		    for x in changed])
+		if phase <= _PHASE_WORTERS and restart:
+			self._resetsolver()
+		return phase
+
+	def _resetsolver(self):
+		self.waterguess = None
+		self.fermentable_extadj = _Mass(0)
+		self._strengthguess = None
+		self.hopsdrunk = {x: _Volume(0) for x in self.hopsdrunk}
+		self._mashmemo = None
+
+	# Make the next calculate() solve from scratch like the first
+	# one does, if it needs to solve at all.  Otherwise a
+	# recalculation starts from the previous solution, and converges
+	# to a slightly different point within the solver tolerances than
+	# a fresh calculation would.  Changes which do not need a new
+	# solve (see _paramphase) still reuse the previous solution, which
+	# gives the same results as a fresh calculation.
+	def restart_solver(self):
+		self._solverrestart = True
+
 	def calculate(self):
+		with self.ctx:
+			self._calculate()
+
+	def _calculate(self):
 		sysparams.checkset()
 
-		if self._calculatestatus:
-			raise PilotError("you can calculate() a recipe once")
-		self._calculatestatus += 1
+		# The recipe may be recalculated after changing system
+		# parameters or the volume.  _calculatestatus is 1 while
+		# calculating and 2 after a successful calculation.
+		prevok = self._calculatestatus == 2
+		self._calculatestatus = 1
 
 		self._checkinputs()
 
@@ -1379,65 +1998,26 @@ class Recipe:
 
 		self.mash.preprocess()
 
-		self._dofermentables_preprocess()
-
-		# ok, so the problem is that the amount of hops affects the
-		# kettle crud, meaning we have non-constants loss between
-		# postboil and the fermentor.  that loss, in turn, affects
-		# the final volume.  we can't replace the lost wort with
-		# water, since that affects both the IBUs and strength.
-		#
-		# to summarize the dependencies
-		# hops => volume => strength => IBUs => hops
-		#
-		# of course, it's easy if we ignore fermentables-by-percent
-		# and hops-by-IBU ... but we don't
-		#
-		# trying to solve analytically gives me a headache, plus it
-		# would (probably?) lead to messy code, since we couldn't
-		# calculate each subcomponent separately anymore.  so, just
-		# do a few loops for the fermentables/mash/hops calculations,
-		# and stop when we reach <0.01l difference with desired final
-		# volume
-		#
-		for x in range(10):
-			# Calculate initial guess for worters, and
-			# especially resolve possible percentages into
-			# masses.  We use "bymass" in this loop
-			# after this call.
-			wrt = self._dofermentables_and_worters()
-
-			# if we need to adjust the boil volume, do so
-			# until we reach a steady state
-			if not laterworter(self.firstworter, Worter.PREBOIL):
-				while self._doboiladj(wrt[Worter.PREBOIL]):
-					wrt = self._doworters_bymass()
-
-			# hops affect worters due to absorption
-			while self._dohops(wrt[Worter.PREBOIL],
-			    wrt[Worter.POSTBOIL],
-			    wrt[Worter.PACKAGE]):
-				wrt = self._doworters_bymass()
-
-			# We need to have hit *at least* the final volume.
-			# Additionally, if final strength was specified,
-			# we need to hit that too.
-			voldiff = self._final_volume() \
-			    - wrt[Worter.PACKAGE].volume()
-
-			if self._final_extract() is not None:
-				extdiff = self._final_extract() \
-				    - wrt[Worter.PACKAGE].extract()
-			else:
-				extdiff = _Mass(0)
+		phase = self._recalcphase(prevok)
+		if phase is None or phase == _PHASE_OUTPUT:
+			self._calculatestatus = 2
+			return
 
-			if abs(voldiff) < 0.01 and abs(extdiff) < 0.1:
-				break
-			self._set_waterguess(self.waterguess + _Mass(voldiff))
+		# the solver trace and iterations are for this calculation,
+		# i.e. empty if it did not need to solve
+		if phase <= _PHASE_WORTERS:
+			wrt, solverinfo = self._dosolve()
 		else:
-			raise Exception('recipe failed to converge ... panic?')
+			wrt = self.worter
+			solverinfo = (None, 0)
+			self._solvertrace = {}
 
 		self.results = {}
+		self.results['solver'] = {
+			'method'	: solverinfo[0],
+			'iterations'	: solverinfo[1],
+		}
+		self.results['solver_trace'] = self._solvertrace
 
 		if self._extract_bytimespec(Timespec.MASH) > 0.001:
 			self._domash(wrt[Worter.MASH])
@@ -1448,6 +2028,8 @@ class Recipe:
 		self.worter = wrt
 		self.results['worter'] = self.worter
 
+		self.opaques = [x for x in self.opaques
+		    if not isinstance(x.obj, Internal)]
 		if self._boiladj > 0.001:
 			assert(not laterworter(self.firstworter,
 			    Worter.PREBOIL))
@@ -1512,7 +2094,7 @@ class Recipe:
 		self.results['total_water'] = Worter(water = self.waterguess)
 
 		self._sanity_check()
-		self._calculatestatus += 1
+		self._calculatestatus = 2
 
 	def _assertcalculate(self):
 		if self._calculatestatus == 0:
@@ -1529,6 +2111,10 @@ class Recipe:
 	# the format is not meant to be human-readable, only readable
 	# by semi-humans
 	def printcsv(self):
+		with self.ctx:
+			self._printcsv()
+
+	def _printcsv(self):
 		self._assertcalculate()
 		print('wbcdata|2')
 		print('# recipe|name|yeast|boiltime|volume')
@@ -37,28 +37,56 @@ class Worter:
 
 	_maxdensity = _Temperature(4)
 
+	# The recipe calculation walks worters through the stages
+	# dozens of times per solver iteration, so keep them cheap:
+	# extract and water are plain floats (kg), and unit objects
+	# are created only when someone asks for them.  The arithmetic
+	# is the same as it would be with the unit objects, so the
+	# results are too.
+	__slots__ = ('_extract', '_water')
+
 	def __init__(self, extract = _Mass(0), water = _Mass(0)):
-		checktypes([(extract, Mass), (water, Mass)])
+		if __debug__:
+			checktypes([(extract, Mass), (water, Mass)])
 
-		self._extract = extract
-		self._water = water
+		self._extract = float(extract)
+		self._water = float(water)
+
+	@classmethod
+	def _new(cls, extract, water):
+		w = cls.__new__(cls)
+		w._extract = extract
+		w._water = water
+		return w
+
+	def copy(self):
+		return Worter._new(self._extract, self._water)
+
+	def __copy__(self):
+		return self.copy()
+
+	def __deepcopy__(self, memo):
+		return self.copy()
 
 	def set_volstrength(self, v, s):
-		checktypes([(v, Volume), (s, Strength)])
+		if __debug__:
+			checktypes([(v, Volume), (s, Strength)])
 		if self._water != 0 or self._extract != 0:
 			raise PilotError("volstrength can be set only on "
 			    + "a virgin worter")
-		m = _Mass(v * s.valueas(s.SG))
-		extract = _Mass(m * s/100.0)
+		m = v * s.valueas(s.SG)
+		extract = m * s/100.0
 		self._extract = extract
 		self._water = m - extract
 
 	def adjust_extract(self, m):
-		checktype(m, Mass)
+		if __debug__:
+			checktype(m, Mass)
 		self._extract += m
 
 	def adjust_water(self, m):
-		checktype(m, Mass)
+		if __debug__:
+			checktype(m, Mass)
 		self._water += m
 
 	# adjust volume, lose/gain water and extract uniformly.  IOW, the
@@ -69,28 +97,49 @@ class Worter:
 	#
 	# returns adjustment as worter
 	def adjust_volume(self, v_adj, temperature = _maxdensity):
-		checktypes([(v_adj, Volume), (temperature, Temperature)])
+		if __debug__:
+			checktypes([(v_adj, Volume),
+			    (temperature, Temperature)])
 
 		v_adj = self._volume(v_adj, temperature, self._maxdensity)
-		if -v_adj > self.volume():
+		if -v_adj > self._maxdensityvolume():
 			raise PilotError("Worter cannot lose more than its "
 			    + "total volume")
 
-		strn = self.strength()
+		plato = self._plato()
 
-		m_totadj = v_adj * strn.valueas(strn.SG)
-		m_extadj = m_totadj * (strn/100.0)
+		m_totadj = v_adj * Strength.plato_to_sg(plato)
+		m_extadj = m_totadj * (plato/100.0)
 
-		adj = Worter(_Mass(m_extadj), _Mass(m_totadj - m_extadj))
+		adj = Worter._new(m_extadj, m_totadj - m_extadj)
 		self += adj
 		return adj
 
 	def mass(self):
 		return _Mass(self._extract + self._water)
 
+	# volumes are corrected only when the temperatures differ.
+	# if they don't, the correction is a multiplication by 1.
+	# (this is brewutils.water_vol_at_temp without the unit objects)
 	def _volume(self, v, t1, t2):
-		return brewutils.water_vol_at_temp(_Volume(v),
-		    t1, t2)
+		if t1 == t2:
+			return v
+		return v * (brewutils._water_density(float(t1))
+		    / brewutils._water_density(float(t2)))
+
+	def _plato(self):
+		m = self._extract + self._water
+		if m == 0:
+			return 0.0
+		p = 100.0 * self._extract / m
+		if p > 42.05:
+			# let Strength complain about it
+			_Strength(p)
+		return p
+
+	def _maxdensityvolume(self):
+		return (self._extract + self._water) \
+		    / Strength.plato_to_sg(self._plato())
 
 	# FIXXXME: I don't know of a lookup table for wort volumetric
 	# expansion, so for now we assume that wort behaves like water
@@ -98,16 +147,14 @@ class Worter:
 	# to expand only the water "part" of the wort, but since I don't
 	# know, not doing extra work for now.
 	def volume(self, temperature = _maxdensity):
-		checktype(temperature, Temperature)
+		if __debug__:
+			checktype(temperature, Temperature)
 
-		v = self.mass() / self.strength().valueas(Strength.SG)
-		return self._volume(v, self._maxdensity, temperature)
+		return _Volume(self._volume(self._maxdensityvolume(),
+		    self._maxdensity, temperature))
 
 	def strength(self):
-		if self.mass() == 0:
-			return _Strength(0)
-		else:
-			return _Strength(100.0 * self._extract / self.mass())
+		return _Strength(self._plato())
 
 	def extract(self):
 		return _Mass(self._extract)
@@ -125,7 +172,7 @@ class Worter:
 	def __add__(self, a):
 		if not isinstance(a, Worter):
 			raise TypeError('Worter can be added only to Worter')
-		return Worter(self._extract + a._extract,
+		return Worter._new(self._extract + a._extract,
 		    self._water + a._water)
 
 	def __isub__(self, s):
@@ -145,11 +192,11 @@ class Worter:
 		if s._water > self._water or s._extract > self._extract:
 			raise PilotError("Cannot subtract more worter "
 			    + "than what you have")
-		return Worter(self._extract - s._extract,
+		return Worter._new(self._extract - s._extract,
 		    self._water - s._water)
 
 	def __neg__(self):
-		return Worter(-self._extract, -self._water)
+		return Worter._new(-self._extract, -self._water)
 
 	def __str__(self):
 		return 'Wort {} ({}): extract {} water {}'.format(
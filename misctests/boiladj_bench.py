@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+#
+# Solve the compiled test recipes with both solvers, with and without
+# a boil volume limit, and show how many passes the boil volume
+# adjustment and the hop absorption took (see Recipe._doboiladj and
+# Recipe._dohops), and how close the preboil volume is to the limit.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/boiladj_bench.py
+#
+
+import glob
+import time
+
+from WBC.wbc import Recipe
+from WBC.units import _Temperature
+from WBC.worter import Worter
+from WBC import recipefile
+from WBC import sysparams
+from WBC.context import Context
+
+def iters(tr, loop):
+	return tr[loop]['iterations'] if loop in tr else 0
+
+if __name__ == '__main__':
+	sysparams.processfile('tests/params-std')
+	for solver, bvmax in [('fixedpoint', None), ('fixedpoint', '27l'),
+	    ('newton', None), ('newton', '27l')]:
+		ctx = Context()
+		with ctx:
+			sysparams.setparam('solver', solver)
+			if bvmax is not None:
+				sysparams.setparam('boilvol_max', bvmax)
+		print('{:s}, boilvol_max {:s}'.format(solver, str(bvmax)))
+		print('  {:48}{:>7}{:>7}{:>7}{:>10}{:>10}'.format('',
+		    'solver', 'boil', 'hops', 'preboil', 'total'))
+		for f in sorted(glob.glob('tests/compiled-recipes/*.yaml')):
+			with ctx:
+				r = Recipe()
+				r.paramdefaults()
+				recipefile.load(r, f)
+			t0 = time.perf_counter()
+			r.calculate()
+			t = time.perf_counter() - t0
+			tr = r.solver_trace()
+			pb = r.worter[Worter.PREBOIL].volume(_Temperature(100))
+			print('  {:48}{:7d}{:7d}{:7d}{:9.3f}l{:8.1f}ms'.format(
+			    f.split('/')[-1], r.results['solver']['iterations'],
+			    iters(tr, 'boiladj'), iters(tr, 'hops'),
+			    float(pb), 1000*t))
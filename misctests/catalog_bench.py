@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+#
+# Time building and querying a fermentable catalog of a few thousand
+# entries, using the indexed Catalog and the linear scans the
+# fermentables module used to do.  For fuzzy search, compare against
+# scoring every name without the index.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/catalog_bench.py
+#
+
+import time
+
+from WBC.fermentables import Catalog, Fermentable, Solid, FGDB
+from WBC.units import Color
+
+NMALTSTERS = 50
+NPRODUCTS = 100
+
+products = ['Pale', 'Pilsner', 'Munich', 'Vienna', 'Wheat', 'Rye',
+    'Crystal', 'Chocolate', 'Black', 'Amber', 'Brown', 'Oat']
+
+def mkferms():
+	res = []
+	for m in range(NMALTSTERS):
+		for p in range(NPRODUCTS):
+			res.append(Fermentable('Maltster{:d}'.format(m),
+			    '{:s} {:d}'.format(products[p % len(products)], p),
+			    Solid(80, FGDB, 2.0, 4.5), Color(10, Color.EBC),
+			    True))
+	return res
+
+# the way it used to be done
+def linear_add(lst, f):
+	old = [x for x in lst if x.name.lower() == f.name.lower()]
+	for x in old:
+		lst.remove(x)
+	lst.append(f)
+
+def linear_find(lst, name):
+	res = [x for x in lst if x.name.lower() == name.lower()]
+	return res[0] if len(res) > 0 else None
+
+def linear_search(lst, maltster, product):
+	l1 = [x for x in lst if maltster.lower() in x.maltster.lower()]
+	l2 = [x for x in lst if product.lower() in x.product.lower()]
+	return [x for x in l1 if x in l2]
+
+def linear_fuzzy(lst, query, limit):
+	q = Catalog._wordgramsof(query.casefold())
+	res = []
+	for i, x in enumerate(lst):
+		g = Catalog._wordgramsof(x.name.casefold())
+		n = len(q & g)
+		if n >= 0.5 * len(q):
+			res.append((n, n/len(q | g), -i))
+	res.sort(reverse = True)
+	return [(lst[-i], n/len(q)) for n, _, i in res[:limit]]
+
+def timeit(what, fun, n = 1):
+	t0 = time.perf_counter()
+	for _ in range(n):
+		rv = fun()
+	print('  {:24}{:10.3f}ms'.format(what,
+	    1000*(time.perf_counter() - t0)/n))
+	return rv
+
+if __name__ == '__main__':
+	ferms = mkferms()
+	names = [x.name for x in ferms[::97]]
+	print('{:d} fermentables'.format(len(ferms)))
+
+	print('indexed')
+	cat = Catalog()
+	timeit('load', lambda: [cat.add(x) for x in ferms])
+	timeit('find', lambda: [cat.find(x) for x in names], 10)
+	r1 = timeit('search', lambda: cat.search('maltster1', 'munich'), 10)
+	timeit('first fuzzy search', lambda: cat.fuzzysearch('x'))
+	f1 = timeit('fuzzy search', lambda: cat.fuzzysearch('munnich 3', 10),
+	    10)
+
+	print('linear')
+	lst = []
+	timeit('load', lambda: [linear_add(lst, x) for x in ferms])
+	timeit('find', lambda: [linear_find(lst, x) for x in names], 10)
+	r2 = timeit('search', lambda: linear_search(lst,
+	    'maltster1', 'munich'))
+	f2 = timeit('fuzzy search', lambda: linear_fuzzy(lst,
+	    'munnich 3', 10))
+
+	assert(r1 == r2)
+	assert(f1 == f2)
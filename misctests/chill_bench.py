@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+#
+# Time brewutils.chill_coolant() against the differential stepping
+# loop wbcchill used to do, and the array version against a loop of
+# chill_coolant() calls, and compare the results.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/chill_bench.py
+#
+
+import itertools
+import time
+
+from WBC import brewutils
+from WBC.units import _Mass, _Temperature
+
+# the way bin/wbcchill used to do it, with cd = wort volume / 10000
+def stepping(wm, whr, wt, tt, ct, cd):
+	totalc = 0
+	tempmin = 0.001
+	while wt > tt + tempmin:
+		cd_max = (wm*whr*(wt-tt))/(tt - ct)
+		if cd_max < cd:
+			cd = cd_max
+		wt = (wt * wm * whr + ct * cd) / (wm * whr + cd)
+		totalc += cd
+	return totalc
+
+def timeit(fun, n):
+	t0 = time.perf_counter()
+	rv = fun()
+	return rv, 1000000*(time.perf_counter() - t0)/n
+
+if __name__ == '__main__':
+	whr = (4.1844 - 0.0293*12) / 4.1844
+	wt = 100.0
+	cases = [(float(wv), float(tt), float(ct))
+	    for wv in range(10, 110, 20)
+	    for tt in range(10, 30, 5)
+	    for ct in range(2, 18, 4) if ct < tt]
+	n = len(cases)
+
+	print('{:d} chills, 10-90l from 100degC'.format(n))
+	print('  {:32}{:>12}{:>16}'.format('', 'per chill', 'max rel. diff'))
+	ref, t = timeit(lambda: [stepping(wv, whr, wt, tt, ct, wv/10000.0)
+	    for wv, tt, ct in cases], n)
+	print('  {:32}{:10.1f}us'.format('stepping, wort/10000', t))
+
+	for what, cd in [('closed form, differential', None),
+	    ('closed form, wort/10000', 'div'),
+	    ('closed form, 1l steps', 1.0)]:
+		def fun():
+			return [brewutils.chill_coolant(_Mass(wv), whr,
+			    _Temperature(wt), _Temperature(tt),
+			    _Temperature(ct),
+			    wv/10000.0 if cd == 'div' else cd)
+			    for wv, tt, ct in cases]
+		res, t = timeit(fun, n)
+		diff = max([abs(x - y)/y for x, y in zip(res, ref)])
+		print('  {:32}{:10.1f}us{:16.1e}'.format(what, t, diff))
+
+	# a wbcchill -T sized sweep, and a bigger one.  import numpy,
+	# if available, before timing
+	brewutils.chill_coolant_array([], [], [], [], [])
+	for nt, nv, nc in [(5, 5, 5), (40, 40, 40)]:
+		grid = list(itertools.product(
+		    [10 + 15.0*i/nt for i in range(nt)],
+		    [10 + 90.0*i/nv for i in range(nv)],
+		    [2 + 7.0*i/nc for i in range(nc)]))
+		n = len(grid)
+		arr, ta = timeit(lambda: brewutils.chill_coolant_array(
+		    [wv for tt, wv, ct in grid], [whr] * n, [wt] * n,
+		    [tt for tt, wv, ct in grid], [ct for tt, wv, ct in grid]),
+		    n)
+		scal, ts = timeit(lambda: [brewutils.chill_coolant(_Mass(wv),
+		    whr, _Temperature(wt), _Temperature(tt),
+		    _Temperature(ct)) for tt, wv, ct in grid], n)
+		diff = max([abs(x - y) for x, y in zip(arr, scal)])
+		print('  {:32}{:10.2f}us{:10.2f}us  maxdiff {:.1e}'.format(
+		    '{:d} points, array/scalar'.format(n), ta, ts, diff))
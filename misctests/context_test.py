@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+#
+# Calculate recipes with different system parameters concurrently,
+# each in its own context, and check that the results match the
+# ones calculated one at a time in the default context.  The first
+# case starts the threads before anything has been calculated, so
+# that they race to load the fermentable catalog.  Exits with an
+# error if the results differ at all or a calculation fails.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/context_test.py
+#
+
+import io
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(__file__))
+from recalculate_test import mkrecipe, params, setparams, summary
+
+from WBC.context import Context
+
+efficiencies = ['70%', '75%', '80%', '85%', '90%']
+
+def calc(bypercent, eff):
+	setparams(params)
+	setparams({'mash_efficiency': eff})
+	r = mkrecipe(bypercent)
+	r.calculate()
+	return summary(r)
+
+def threaded(bypercent):
+	got = [None] * len(efficiencies)
+	diags = [io.StringIO() for x in efficiencies]
+	def worker(i):
+		with Context(diag = diags[i]):
+			for _ in range(5):
+				got[i] = calc(bypercent, efficiencies[i])
+
+	threads = [threading.Thread(target = worker, args = (i,))
+	    for i in range(len(efficiencies))]
+	for t in threads: t.start()
+	for t in threads: t.join()
+	return got, diags
+
+if __name__ == '__main__':
+	failed = False
+	for name, bypercent, cold in [('cold start', False, True),
+	    ('bymass', False, False), ('bypercent', True, False)]:
+		print(name)
+		if cold:
+			got, diags = threaded(bypercent)
+		expect = [calc(bypercent, x) for x in efficiencies]
+		if not cold:
+			got, diags = threaded(bypercent)
+
+		for i, eff in enumerate(efficiencies):
+			if got[i] is None:
+				print('  {:5} FAILED'.format(eff))
+				failed = True
+				continue
+			diff = max([abs(x - y) for x, y
+			    in zip(expect[i], got[i])])
+			print('  {:5} maxdiff {:.6f}, {:d} bytes of '
+			    'diagnostics'.format(eff, diff,
+			      len(diags[i].getvalue())))
+			if diff != 0:
+				print('  FAILED')
+				failed = True
+	sys.exit(1 if failed else 0)
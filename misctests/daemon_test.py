@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+#
+# Start wbcd on a private socket and check that the tools it runs
+# behave the same as when run directly: same output on stdout and
+# stderr (passed as file descriptors), same exit status, the recipe
+# can come from stdin, system parameters set by one request do not
+# leak into the next, and the fermentable catalog is the one of the
+# request's working directory.  Also prints how long a request takes
+# through wbcd and without it.  Exits with an error if a check fails.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/daemon_test.py
+#
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+top = os.getcwd()
+bindir = os.path.join(top, 'bin')
+testdir = os.path.join(top, 'tests')
+recipe = 'compiled-recipes/std-infusion,single-mass-basic.yaml'
+
+failed = False
+
+def check(what, ok):
+	global failed
+	print('  {:50} {:s}'.format(what, 'ok' if ok else 'FAILED'))
+	if not ok:
+		failed = True
+
+def run(args, env, cwd = testdir, stdin = None, daemon = True):
+	env = dict(env)
+	if not daemon:
+		env['WBC_NODAEMON'] = '1'
+	return subprocess.run([sys.executable] + args, env = env, cwd = cwd,
+	    input = stdin, capture_output = True)
+
+# run a request with only the client side of forward(), i.e. exit
+# with 99 if wbcd did not serve it
+def forwarded(tool, env):
+	code = 'import sys; sys.argv = [{:s}] + sys.argv[1:]; ' \
+	    'from WBC import daemon; daemon.forward(); ' \
+	    'sys.exit(99)'.format(repr(os.path.join(bindir, tool)))
+	return run(['-c', code, '1.050', '1.010'], env).returncode == 0
+
+# same results through wbcd and without, and the expected exit status
+def same(args, env, rv = 0, **kw):
+	a = run(args, env, **kw)
+	b = run(args, env, daemon = False, **kw)
+	return a.returncode == rv and (a.returncode, a.stdout, a.stderr) \
+	    == (b.returncode, b.stdout, b.stderr)
+
+def besttime(args, env, daemon):
+	best = None
+	for _ in range(7):
+		t0 = time.perf_counter()
+		run(args, env, daemon = daemon)
+		t = time.perf_counter() - t0
+		best = t if best is None else min(best, t)
+	return 1000*best
+
+if __name__ == '__main__':
+	tmpdir = tempfile.mkdtemp()
+	env = dict(os.environ)
+	env.update({
+		'WBC_SOCKET'	: os.path.join(tmpdir, 'wbcd.sock'),
+		'WBC_CACHEDIR'	: os.path.join(tmpdir, 'cache'),
+		'WBC_NOCACHE'	: '1',
+		'HOME'		: tmpdir,
+	})
+	# the tools run in other directories
+	env['PYTHONPATH'] = os.pathsep.join([os.path.abspath(x)
+	    for x in env.get('PYTHONPATH', '.').split(os.pathsep)])
+	env.pop('WBC_NODAEMON', None)
+	env.pop('WBC_FERMENTABLES', None)
+
+	wbcd = subprocess.Popen([sys.executable,
+	    os.path.join(bindir, 'wbcd')], env = env, cwd = tmpdir,
+	    stderr = subprocess.DEVNULL)
+	for _ in range(100):
+		if os.path.exists(env['WBC_SOCKET']):
+			break
+		time.sleep(.1)
+
+	try:
+		wbcrecipe = os.path.join(bindir, 'wbcrecipe')
+		check('request is served by wbcd', forwarded('wbcabv', env))
+		check('recipe output', same([wbcrecipe,
+		    '-p', 'params-std', recipe], env))
+		with open(os.path.join(testdir, recipe), 'rb') as f:
+			check('recipe from stdin', same([wbcrecipe,
+			    '-p', 'params-std', '-'], env, stdin = f.read()))
+		check('exit status of a failing tool', same([wbcrecipe,
+		    '-p', 'params-std', 'nonexistent.yaml'], env, rv = 1))
+		run([wbcrecipe, '-p', 'params-std', '-P',
+		    'mash_efficiency=60%', recipe], env)
+		check('no sysparams from earlier requests', same([wbcrecipe,
+		    '-p', 'params-std', recipe], env))
+
+		# a fermentable which exists only in the catalog of the
+		# directory the request is made from
+		catdir = os.path.join(tmpdir, 'catalog')
+		os.mkdir(catdir)
+		with open(os.path.join(catdir, '.wbcfermentables'),
+		    'w') as f:
+			f.write('Testmaltster|Testmalt|80%|FGDB|1.5|4.5|'
+			    '6.5EBC\n')
+		with open(os.path.join(testdir, recipe), 'r') as f:
+			data = f.read().replace('Avangard Pilsner',
+			    'Testmaltster Testmalt').encode('utf-8')
+		args = [wbcrecipe, '-p', os.path.join(testdir, 'params-std'),
+		    '-']
+		check('catalog of the request', same(args, env,
+		    cwd = catdir, stdin = data))
+
+		args = [wbcrecipe, '-p', 'params-std', recipe]
+		print('  wbcrecipe {:.1f}ms through wbcd, {:.1f}ms '
+		    'without'.format(besttime(args, env, True),
+		      besttime(args, env, False)))
+	finally:
+		wbcd.terminate()
+		wbcd.wait()
+		shutil.rmtree(tmpdir)
+	sys.exit(1 if failed else 0)
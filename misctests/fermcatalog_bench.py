@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+#
+# Time loading a fermentable catalog file of 10000 entries, both from
+# the source and from the compiled file, into an empty catalog.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/fermcatalog_bench.py
+#
+
+import os
+import shutil
+import tempfile
+import time
+
+from WBC import fermcatalog
+from WBC.fermentables import Catalog
+
+NENTRIES = 10000
+
+def mksource(path):
+	with open(path, 'w') as f:
+		for i in range(NENTRIES):
+			f.write('Maltster{:d}|Product {:d}|{:.1f}%|FGDB|'
+			    '1.5|4.5|{:.1f}EBC\n'.format(i % 100, i,
+			      78 + (i % 50)/10.0, 3 + i % 500))
+
+def timeit(what, fun):
+	t0 = time.perf_counter()
+	rv = fun()
+	print('  {:24}{:10.3f}ms'.format(what,
+	    1000*(time.perf_counter() - t0)))
+	return rv
+
+def load(store):
+	cat = Catalog()
+	cat.addstore(store)
+	return cat
+
+if __name__ == '__main__':
+	tmpdir = tempfile.mkdtemp()
+	os.environ['WBC_CACHEDIR'] = tmpdir
+	src = os.path.join(tmpdir, 'fermentables')
+	mksource(src)
+
+	timeit('compile', lambda: fermcatalog.compilecatalog(src,
+	    fermcatalog.compiledpath(src)))
+
+	for what, mk in [
+		('source', lambda: fermcatalog.SourceStore(src)),
+		('compiled', lambda: fermcatalog.CompiledStore(
+		    fermcatalog.compiledpath(src), os.stat(src))),
+	]:
+		print(what)
+		cat = timeit('load', lambda: load(mk()))
+		timeit('find', lambda: cat.find('Maltster7 Product 5007'))
+		timeit('first search', lambda: cat.search(None, 'uct 99'))
+		timeit('second search', lambda: cat.search(None, 'uct 98'))
+	shutil.rmtree(tmpdir)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+#
+# Time Mash.do_mash() the way the recipe solver calls it: the same
+# grains and steps, with the amount of water changing a little on
+# every iteration.  Also shows the peak mash volume, which should
+# stay within mashvol_max.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/mash_bench.py
+#
+
+import time
+
+from WBC import mash, parse, sysparams, context
+from WBC.worter import Worter
+from WBC.units import _Mass
+from WBC.getparam import getparam
+
+N = 2000
+
+class Grain:
+	def __init__(self, amount):
+		self.amount = _Mass(amount)
+
+	def get_amount(self):
+		return self.amount
+
+stepsets = [
+	['65degC'],
+	['50degC', '65degC', '78degC'],
+	['45degC', '62degC@decoction', '72degC', '78degC@heat'],
+]
+
+def mkmash(steps):
+	m = mash.Mash()
+	ms = []
+	for s in steps:
+		t, _, method = s.partition('@')
+		ms.append(mash.MashStep(parse.temperature(t),
+		    method = method or None))
+	m.set_steps(ms)
+	m.preprocess()
+	m.set_fermentables([Grain(6)])
+	return m
+
+if __name__ == '__main__':
+	sysparams.processfile('tests/params-std')
+	context.current().params['mashwater_min'] = None
+	context.current().params['lautervol_max'] = None
+
+	for mvmax in [None, '32l']:
+		context.current().params['mashvol_max'] = None
+		if mvmax is not None:
+			sysparams.setparam('mashvol_max', mvmax)
+		for ratio in ['2l/kg', '30%']:
+			sysparams.setparam('mashin_ratio', ratio)
+			for steps in stepsets:
+				m = mkmash(steps)
+				t0 = time.perf_counter()
+				for i in range(N):
+					r = m.do_mash(getparam('ambient_temp'),
+					    Worter(water = _Mass(45 + i/N)),
+					    1.0)
+				t = 1000000*(time.perf_counter() - t0)/N
+				mvol = r['mashvol_peak']
+				print('{:6} {:6} {:42}{:8.1f}us{:>10}'.format(
+				    str(mvmax), ratio, ' '.join(steps), t,
+				    str(mvol)))
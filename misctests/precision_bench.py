@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+#
+# Solver iterations and time for batch sizes from 5l to 100hl,
+# with both "absolute" and "relative" solver precision.  Each size
+# is calculated from scratch.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/precision_bench.py
+#
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+from recalculate_test import mkrecipe, params, setparams, iters
+
+from WBC import sysparams
+
+volumes = ['5l', '20l', '50l', '1hl', '5hl', '10hl', '20hl', '50hl', '100hl']
+
+if __name__ == '__main__':
+	setparams(params)
+	for bypercent in [False, True]:
+		print('bypercent' if bypercent else 'bymass')
+		print('  {:>8}{:>20}{:>20}'.format('volume',
+		    'absolute', 'relative'))
+		for vol in volumes:
+			res = []
+			for prec in ['absolute', 'relative']:
+				sysparams.setparam('solver_precision', prec)
+				r = mkrecipe(bypercent, vol)
+				t0 = time.perf_counter()
+				try:
+					r.calculate()
+					res.append('{:4d} it {:7.1f}ms'.format(
+					    iters(r),
+					    1000*(time.perf_counter() - t0)))
+				except Exception:
+					res.append('failed')
+			print('  {:>8}{:>20}{:>20}'.format(vol, *res))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+#
+# Check that recalculating a recipe after changing system parameters
+# or the volume gives the same results as calculating a fresh recipe
+# with the same inputs.  Also prints how many solver iterations
+# the recalculation took compared to the fresh calculation.  Exits
+# with an error if the results are further apart than the solver
+# tolerances allow.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/recalculate_test.py
+#
+
+import sys
+
+from WBC.wbc import Recipe
+from WBC.hop import Hop
+from WBC.worter import Worter
+from WBC import parse
+from WBC import sysparams
+
+params = {
+	'mash_efficiency'	: '88%',
+	'boiloff_perhour'	: '3.5l',
+	'mlt_loss'		: '1l',
+	'mlt_heatcapacity'	: '1.5',
+	'mlt_heat'		: 'transfer',
+	'kettle_loss'		: '2.0l',
+	'fermentor_loss'	: '1.0l',
+}
+
+changes = [
+	('kettle_loss', '3.0l'),
+	('fermentor_loss', '0.5l'),
+	('mash_efficiency', '75%'),
+	('mashin_ratio', '40%'),
+	('units_output', 'us'),
+	('volume', '40l'),
+]
+
+# Both calculations stop somewhere within the solver's volume
+# tolerance (0.01l) of the target, so the results may be up to twice
+# that apart.
+tolerance = 0.02
+
+def setparams(p):
+	for x in p:
+		sysparams.setparam(x, p[x])
+
+def mkrecipe(bypercent, volume = None):
+	r = Recipe()
+	r.set_name('recalc')
+	r.set_yeast('yeastieboys', None)
+	r.set_inherent_volume(parse.volume('20l'))
+	r.set_boiltime(parse.duration('60min'))
+	if volume is not None:
+		r.set_volume_and_scale(parse.volume(volume))
+	r.mash.set_steps([parse.mashstep('65degC')])
+
+	mash = parse.timespec('mash')
+	if bypercent:
+		r.anchor_bystrength(parse.strength('13degP'))
+		r.fermentable_bypercent('Weyermann Pale', 90, mash)
+		r.fermentable_bypercent('Weyermann Munich I',
+		    Recipe.THEREST, mash)
+	else:
+		r.fermentable_byunit('Weyermann Pale',
+		    parse.mass('4kg'), mash)
+		r.fermentable_byunit('Weyermann Munich I',
+		    parse.mass('500g'), mash)
+
+	hop = Hop('Testhop', parse.percent('8%'))
+	r.hop_byunit(hop, parse.mass('40g'), parse.timespec('60min'))
+	r.hop_byIBU(Hop('Testhop2', parse.percent('5%')), 10,
+	    parse.timespec('10min'))
+	return r
+
+def summary(r):
+	w = r.results['worter']
+	return [float(w[x].volume()) for x in Worter.stages] \
+	    + [float(w[x].strength()) for x in Worter.stages] \
+	    + [float(x.get_amount()) for x in r.results['fermentables']] \
+	    + [float(x.get_amount()) for x in r.results['hops']] \
+	    + [float(r.results['mash']['sparge_water'].water())]
+
+def iters(r):
+	tr = r.results['solver_trace']
+	return sum([tr[x]['iterations'] for x in tr])
+
+if __name__ == '__main__':
+	failed = False
+	for bypercent in [False, True]:
+		print('bypercent' if bypercent else 'bymass')
+		setparams(params)
+		r = mkrecipe(bypercent)
+		r.calculate()
+		vol = None
+		for p, v in changes:
+			if p == 'volume':
+				vol = v
+				r.set_volume_and_scale(parse.volume(v))
+			else:
+				sysparams.setparam(p, v)
+			r.calculate()
+			riters = iters(r)
+
+			fresh = mkrecipe(bypercent, vol)
+			fresh.calculate()
+
+			diff = max([abs(x - y) for x, y
+			    in zip(summary(r), summary(fresh))])
+			print('  {:20} maxdiff {:.5f}, iterations {:3d} vs. '
+			    '{:3d} fresh'.format(p + '=' + v, diff,
+			      riters, iters(fresh)))
+			if diff > tolerance:
+				print('  FAILED')
+				failed = True
+	sys.exit(1 if failed else 0)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+#
+# Solve the test recipes which mix by-mass fermentables with fixed
+# percentages and "rest", and show how much work finding the "rest"
+# percentages took (see Recipe._dofermentables_bypercent) and how
+# close the fixed percentages ended up to the recipe.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/rest_bench.py
+#
+
+import glob
+import time
+
+from WBC.wbc import Recipe
+from WBC import recipefile
+from WBC import sysparams
+
+# largest difference of a fixed percentage from the recipe
+def pcterror(r):
+	def key(x):
+		return (x.obj.name, str(x.time))
+	wanted = {key(x): x.get_amount() for x in r._fermfilter('p')}
+	allmass = r._fermentables_massof(r.fermentables)
+	return max([abs(wanted[key(x)] - 100.0 * (x.get_amount() / allmass))
+	    for x in r.fermentables if key(x) in wanted])
+
+if __name__ == '__main__':
+	sysparams.processfile('tests/params-std')
+	print('  {:48}{:>7}{:>7}{:>10}{:>10}{:>10}'.format('', 'calls',
+	    'iters', 'in rest', 'total', 'pct err'))
+	for f in sorted(glob.glob('tests/compiled-recipes/*.yaml')
+	    + glob.glob('tests/test-recipes/*.yaml')):
+		r = Recipe()
+		r.paramdefaults()
+		recipefile.load(r, f)
+		if len(r._fermfilter('m')) == 0 \
+		    or len(r._fermfilter('r')) == 0 \
+		    or len(r._fermfilter('p')) == 0:
+			continue
+
+		t0 = time.perf_counter()
+		r.calculate()
+		t = time.perf_counter() - t0
+		tr = r.solver_trace()['rest']
+		print('  {:48}{:7d}{:7d}{:8.2f}ms{:8.1f}ms{:10.4f}'.format(
+		    f.split('/')[-1], tr['calls'], tr['iterations'],
+		    1000*tr['time'], 1000*t, pcterror(r)))
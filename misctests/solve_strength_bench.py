@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+#
+# Time solve_strength() against the iterative version it replaced,
+# and the array version, and compare their accuracy.  Then count and
+# time the solve_strength() calls made while calculating each recipe
+# in tests/compiled-recipes.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/solve_strength_bench.py
+#
+
+import glob
+import random
+import time
+
+from WBC import brewutils
+from WBC.units import Strength, _Mass, _Volume, _Strength
+
+N = 20000
+
+# the way it used to be done
+def iterative(extract, volume):
+	mass = volume
+	loop = 0
+	while True:
+		plato = 100 * extract / mass
+		diff = volume - mass / Strength.plato_to_sg(plato)
+		if diff < 1.0/(1000*1000):
+			break
+		mass += diff
+		loop += 1
+		assert(loop < 10)
+	return _Strength(plato)
+
+# relative error of the volume for the strength
+def error(extract, volume, plato):
+	mass = 100 * extract / plato
+	return abs(mass / Strength.plato_to_sg(plato) - volume) / volume
+
+# best of five, the machine is doing other things too
+def timeit(fun):
+	best = None
+	for _ in range(5):
+		t0 = time.perf_counter()
+		rv = fun()
+		t = time.perf_counter() - t0
+		if best is None or t < best:
+			best = t
+	return rv, 1000000*best/N
+
+if __name__ == '__main__':
+	random.seed(1)
+	inputs = []
+	while len(inputs) < N:
+		e, v = random.uniform(0.01, 10), random.uniform(1, 60)
+		if 100*e/v < 40:
+			inputs.append((_Mass(e), _Volume(v)))
+
+	print('{:d} random worts up to 40degP'.format(N))
+	print('  {:20}{:>12}{:>16}'.format('', 'per call', 'max error'))
+	for what, fun in [
+		('iterative', lambda: [iterative(e, v) for e, v in inputs]),
+		('closed form', lambda: [brewutils.solve_strength(e, v)
+		    for e, v in inputs]),
+		('array', lambda: brewutils.solve_strength_array(
+		    [x[0] for x in inputs], [x[1] for x in inputs])),
+	]:
+		res, t = timeit(fun)
+		err = max([error(e, v, p) for (e, v), p in zip(inputs, res)])
+		print('  {:20}{:10.2f}us{:16.1e}'.format(what, t, err))
+
+	from WBC.wbc import Recipe
+	from WBC import recipefile
+	from WBC import sysparams
+
+	sysparams.processfile('tests/params-std')
+
+	calls = [0, 0]
+	orig = brewutils.solve_strength
+	def counted(extract, volume):
+		t0 = time.perf_counter()
+		rv = orig(extract, volume)
+		calls[0] += 1
+		calls[1] += time.perf_counter() - t0
+		return rv
+	brewutils.solve_strength = counted
+
+	print('  {:44}{:>8}{:>12}{:>12}'.format('', 'calls',
+	    'in solve', 'calculate'))
+	for f in sorted(glob.glob('tests/compiled-recipes/*.yaml')):
+		r = Recipe()
+		r.paramdefaults()
+		recipefile.load(r, f)
+		calls[:] = [0, 0]
+		t0 = time.perf_counter()
+		r.calculate()
+		t = time.perf_counter() - t0
+		print('  {:44}{:8d}{:10.2f}ms{:10.1f}ms'.format(
+		    f.split('/')[-1], calls[0], 1000*calls[1], 1000*t))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+#
+# Compare the Strength conversions of a batch of values against
+# converting them one at a time, and time both.  Batches use numpy
+# if it is installed.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/strength_array_test.py
+#
+
+import random
+import time
+
+from WBC.units import Strength, _Strength
+
+N = 100000
+
+def timeit(fun):
+	t0 = time.perf_counter()
+	rv = fun()
+	return rv, 1000*(time.perf_counter() - t0)
+
+def compare(what, arrfun, scalarfun):
+	a, ta = timeit(arrfun)
+	s, ts = timeit(scalarfun)
+	diff = max([abs(x - y) for x, y in zip(a, s)])
+	print('  {:24}{:10.1f}ms{:10.1f}ms   maxdiff {:.1e}'.format(what,
+	    ta, ts, diff))
+
+if __name__ == '__main__':
+	random.seed(1)
+	platos = [random.uniform(0.5, 30) for _ in range(N)]
+	sgs = [random.uniform(0.995, 1.130) for _ in range(N)]
+	aas = [random.uniform(50, 90) for _ in range(N)]
+
+	print('{:d} values, {:s}'.format(N,
+	    type(Strength.plato_to_sg([])).__module__))
+	print('  {:24}{:>12}{:>12}'.format('', 'batch', 'scalar'))
+	compare('plato_to_sg', lambda: Strength.plato_to_sg(platos),
+	    lambda: [Strength.plato_to_sg(x) for x in platos])
+	compare('sg_to_plato', lambda: Strength.sg_to_plato(sgs),
+	    lambda: [Strength.sg_to_plato(x) for x in sgs])
+	compare('valueas(SG_PTS)', lambda: Strength.valueas(platos,
+	    Strength.SG_PTS), lambda: [_Strength(x).valueas(Strength.SG_PTS)
+	      for x in platos])
+
+	arr, ta = timeit(lambda: Strength.attenuate_bypercent(platos,
+	    aas))
+	scal, ts = timeit(lambda: [_Strength(x).attenuate_bypercent(a)
+	    for x, a in zip(platos, aas)])
+	print('  {:24}{:10.1f}ms{:10.1f}ms'.format('attenuate_bypercent',
+	    ta, ts))
+	for k in sorted(arr):
+		diff = max([abs(x - float(y[k])) for x, y
+		    in zip(arr[k], scal)])
+		print('    {:22}{:>36}'.format(k, '{:.1e}'.format(diff)))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+#
+# Compare the "polynomials" and "invertible" strength_conversion
+# modes: how well SG->Plato inverts Plato->SG, the size of the gaps
+# between the SG->Plato polynomials, and solver iterations and
+# failures over a sweep of strengths, both for solve_strength_fromabv
+# and for whole recipes.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/strength_conversion_bench.py
+#
+
+import os
+import sys
+
+from WBC.units import Strength
+from WBC.utils import PilotError
+from WBC import brewutils
+from WBC import sysparams
+
+modes = ['polynomials', 'invertible']
+
+def conversions():
+	platos = [x/100.0 for x in range(0, 4000)]
+	rt = max([abs(Strength.sg_to_plato(Strength.plato_to_sg(x)) - x)
+	    for x in platos])
+	gaps = [abs(Strength.sg_to_plato(x + 1e-12)
+	    - Strength.sg_to_plato(x - 1e-12)) for x in [1.0020, 1.088]]
+	return ['{:.1e}'.format(rt)] + ['{:.1e}'.format(x) for x in gaps]
+
+# count the attenuations solve_strength_fromabv does
+def fromabv():
+	calls = [0]
+	orig = Strength.attenuate_bypercent
+	def counted(self, aa):
+		calls[0] += 1
+		return orig(self, aa)
+	Strength.attenuate_bypercent = counted
+
+	fails = 0
+	n = 0
+	try:
+		for abv in [x/4.0 for x in range(4, 49)]:
+			for aa in range(50, 95, 5):
+				n += 1
+				try:
+					brewutils.solve_strength_fromabv(abv,
+					    float(aa))
+				except PilotError:
+					fails += 1
+	finally:
+		Strength.attenuate_bypercent = orig
+	return ['{:.2f}'.format(calls[0]/n), str(fails)]
+
+def recipes():
+	sys.path.insert(0, os.path.dirname(__file__))
+	from recalculate_test import params, setparams, iters
+	from WBC.wbc import Recipe
+	from WBC import parse
+
+	setparams(params)
+	tot = 0
+	fails = 0
+	n = 0
+	for plato in range(6, 32, 2):
+		r = Recipe()
+		r.set_name('conv')
+		r.set_yeast('yeastieboys', None)
+		r.set_inherent_volume(parse.volume('20l'))
+		r.set_boiltime(parse.duration('60min'))
+		r.mash.set_steps([parse.mashstep('65degC')])
+		r.anchor_bystrength(parse.strength(str(plato) + 'degP'))
+		mash = parse.timespec('mash')
+		r.fermentable_bypercent('Weyermann Pale', 90, mash)
+		r.fermentable_bypercent('Weyermann Munich I',
+		    Recipe.THEREST, mash)
+		n += 1
+		try:
+			r.calculate()
+			tot += iters(r)
+		except PilotError:
+			fails += 1
+	return ['{:.1f}'.format(tot/max(n - fails, 1)), str(fails)]
+
+def table(title, cols, fun):
+	print(title)
+	print('  {:14}'.format('') + ''.join(['{:>14}'.format(x)
+	    for x in cols]))
+	for m in modes:
+		sysparams.setparam('strength_conversion', m)
+		print('  {:14}'.format(m) + ''.join(['{:>14}'.format(x)
+		    for x in fun()]))
+
+if __name__ == '__main__':
+	table('conversions', ['roundtrip', 'gap@1.002', 'gap@1.088'],
+	    conversions)
+	table('solve_strength_fromabv', ['iterations', 'failures'],
+	    fromabv)
+	table('recipes (by percent, 6-30degP)', ['iterations', 'failures'],
+	    recipes)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+#
+# Time unit object construction, arithmetic and valueas() conversions,
+# and the type checks done on them.  Run also with "python3 -O" to
+# see the effect of the hot path type checks being compiled out.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/units_bench.py
+#
+
+import time
+
+from WBC.units import Mass, Volume, Strength, Temperature
+from WBC.units import _Mass, _Volume, _Strength, _Temperature
+from WBC.worter import Worter
+from WBC import brewutils
+
+N = 100000
+
+m1 = _Mass(4.2)
+m2 = _Mass(0.3)
+s1 = _Strength(12.5)
+t1 = _Temperature(66)
+t2 = _Temperature(20)
+v1 = _Volume(21)
+w = Worter(water = _Mass(25))
+
+benches = [
+	('Mass(x, G)',		lambda: Mass(420, Mass.G)),
+	('_Mass(x)',		lambda: _Mass(4.2)),
+	('_Volume(x)',		lambda: _Volume(21)),
+	('_Strength(x)',	lambda: _Strength(12.5)),
+	('Strength(x, SG)',	lambda: Strength(1.050, Strength.SG)),
+	('Mass + Mass',		lambda: m1 + m2),
+	('Mass - Mass',		lambda: m1 - m2),
+	('-Mass',		lambda: -m1),
+	('Mass.valueas(G)',	lambda: m1.valueas(Mass.G)),
+	('Strength.valueas(SG)', lambda: s1.valueas(Strength.SG)),
+	('Temp.valueas(degF)',	lambda: t1.valueas(Temperature.degF)),
+	('Worter.adjust_water',	lambda: w.adjust_water(m2)),
+	('water_vol_at_temp',	lambda: brewutils.water_vol_at_temp(v1,
+				    t1, t2)),
+	('solve_strength',	lambda: brewutils.solve_strength(m1, v1)),
+]
+
+if __name__ == '__main__':
+	print('type checks ' + ('on' if __debug__ else 'off (-O)'))
+	for what, fun in benches:
+		t0 = time.perf_counter()
+		for _ in range(N):
+			fun()
+		print('  {:24}{:10.3f}us'.format(what,
+		    1000000*(time.perf_counter() - t0)/N))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+#
+# Calculate a recipe cold, then again seeded from the warm-start
+# cache, and check that the seeded calculation gives exactly the
+# same results and converges on the first solver pass.  A recipe which
+# differs only in what the solve does not depend on (here mash and
+# output parameters) must hit the cache too, and one with a different
+# volume must miss it.  Prints the solver iterations for each, exits
+# with an error if a check fails.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/warmstart_test.py
+#
+
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+from recalculate_test import mkrecipe, params, setparams, iters, summary
+
+from WBC.cache import WarmStart
+
+from WBC.context import Context
+
+# the same solve as the plain recipe
+variant = {
+	'mashin_ratio'	: '40%',
+	'units_output'	: 'us',
+}
+
+def mkvariant(bypercent, volume, isvariant):
+	if not isvariant:
+		return mkrecipe(bypercent, volume)
+	with Context():
+		setparams(variant)
+		return mkrecipe(bypercent, volume)
+
+def run(bypercent, volume, isvariant):
+	r = mkvariant(bypercent, volume, isvariant)
+	ws = WarmStart(r)
+	hit = ws.seed()
+	r.calculate()
+	ws.store()
+	return r, hit
+
+if __name__ == '__main__':
+	cachedir = tempfile.mkdtemp()
+	os.environ['WBC_CACHEDIR'] = cachedir
+	setparams(params)
+	failed = False
+	for bypercent in [False, True]:
+		print('bypercent' if bypercent else 'bymass')
+		for name, vol, isvariant, expect in [
+		    ('cold', None, False, False),
+		    ('same', None, False, True),
+		    ('variant', None, True, True),
+		    ('25l', '25l', False, False)]:
+			r, hit = run(bypercent, vol, isvariant)
+			cold = mkvariant(bypercent, vol, isvariant)
+			cold.calculate()
+			diff = max([abs(x - y) for x, y
+			    in zip(summary(r), summary(cold))])
+			passes = r.results['solver']['iterations']
+			print('  {:8} hit {:6} passes {:2d} iterations '
+			    '{:3d} maxdiff {:.6f}'.format(name, str(hit),
+			      passes, iters(r), diff))
+			if diff != 0 or hit != expect \
+			    or (hit and passes != 1):
+				print('  FAILED')
+				failed = True
+	shutil.rmtree(cachedir)
+	sys.exit(1 if failed else 0)
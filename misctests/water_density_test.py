@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+#
+# Compare the water densities from brewutils against Kell's formula
+# (G. S. Kell, J. Chem. Eng. Data 20, 1975), which is good to a few
+# ppm over 0-100degC.  Also shows what picking the nearest table
+# entry, as brewutils used to do, gives.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/water_density_test.py
+#
+
+from WBC import brewutils
+from WBC.units import _Temperature, _Volume
+
+def kell(t):
+	return (999.83952 + 16.945176*t - 7.9870401e-3*t**2
+	    - 46.170461e-6*t**3 + 105.56302e-9*t**4
+	    - 280.54253e-12*t**5) / (1 + 16.879850e-3*t) / 1000.0
+
+def nearest(t):
+	tab = brewutils._watertab
+	best = None
+	for x in sorted(tab):
+		d = abs(t - x)
+		if best is None or d <= bestd:
+			best, bestd = x, d
+	return tab[best]
+
+# the mass of a liter is the density
+def interpolated(t):
+	return brewutils.water_voltemp_to_mass(_Volume(1), _Temperature(t))
+
+if __name__ == '__main__':
+	temps = [x/10.0 for x in range(0, 1001)]
+	print('  {:16}{:>12}{:>12}'.format('', 'max error', 'at degC'))
+	for what, fun in [('nearest', nearest),
+	    ('interpolated', interpolated)]:
+		err = [(abs(fun(t) - kell(t)), t) for t in temps]
+		e, t = max(err)
+		print('  {:16}{:12.1e}{:12.1f}'.format(what, e, t))
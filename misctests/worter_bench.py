@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+#
+# Time the worter stage walk the recipe solver does on every
+# iteration (see Recipe._doworters_bymass), and then the calculation
+# of each recipe in tests/compiled-recipes.
+#
+# run from the top level directory:
+#   PYTHONPATH=. python3 misctests/worter_bench.py
+#
+
+import glob
+import time
+
+from WBC.worter import Worter
+from WBC.units import _Mass, _Volume, _Temperature
+
+NWALKS = 10000
+
+def walk():
+	res = {}
+	for s in Worter.stages:
+		res[s] = Worter()
+
+	w = Worter(water = _Mass(30))
+	w.adjust_extract(_Mass(4.1))
+	w.adjust_water(_Mass(0.2))
+	res[Worter.MASH] = w.copy()
+	w.adjust_water(_Mass(-4.5))
+	w -= Worter(water = _Mass(0.3))
+
+	res[Worter.PREBOIL] = w.copy()
+	w.adjust_water(_Mass(-3.5))
+	w.adjust_extract(_Mass(0.5))
+	res[Worter.POSTBOIL] = w.copy()
+
+	w.adjust_volume(_Volume(-2))
+	w.adjust_water(_Mass(1))
+	res[Worter.FERMENTOR] = w.copy()
+
+	w.adjust_volume(_Volume(-1))
+	res[Worter.PACKAGE] = w.copy()
+
+	res[Worter.PREBOIL].volume(_Temperature(100))
+	return [(x.volume(), x.strength()) for x in res.values()]
+
+if __name__ == '__main__':
+	t0 = time.perf_counter()
+	for _ in range(NWALKS):
+		walk()
+	print('stage walk {:24.1f}us'.format(
+	    1000000*(time.perf_counter() - t0)/NWALKS))
+
+	from WBC.wbc import Recipe
+	from WBC import recipefile
+	from WBC import sysparams
+
+	sysparams.processfile('tests/params-std')
+
+	for f in sorted(glob.glob('tests/compiled-recipes/*.yaml')):
+		r = Recipe()
+		r.paramdefaults()
+		recipefile.load(r, f)
+		t0 = time.perf_counter()
+		r.calculate()
+		print('{:44}{:8.1f}ms'.format(f.split('/')[-1],
+		    1000*(time.perf_counter() - t0)))
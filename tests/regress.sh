@@ -20,6 +20,18 @@
 export PYTHONPATH=..
 export PATH="../bin:${PATH}"
 
+# always calculate, don't print results cached by wbcrecipe,
+# and test the tools in this tree, not whatever wbcd is running
+export WBC_NOCACHE=1
+export WBC_NODAEMON=1
+
+# the small utilities should start fast, i.e. not import the
+# recipe engine, the fermentable catalog or yaml.  the budget is
+# the total import time of WBC modules, in milliseconds.
+LIGHTTOOLS='wbcabv wbcadjust wbcbeercolor wbcchill wbcco2 wbcso2
+    wbcsolve wbcparamdecode wbc_datefmt'
+IMPORTBUDGET=${WBC_IMPORTBUDGET:-100}
+
 die ()
 {
 
@@ -36,7 +48,7 @@ msg ()
 usage ()
 {
 
-	die usage: $0 prep\|test\|reset
+	die usage: $0 prep\|test\|reset\|imports
 }
 
 _prep ()
@@ -111,6 +123,24 @@ doprep ()
 	    test-recipes/proto-bymass.yaml
 	preprecipe vol wbcrecipe -v 40l -P bM=35L -p params-std \
 	    test-recipes/proto-bymass.yaml
+	preprecipe vol wbcrecipe -L 20l,50l,1hl -p params-std -m \
+	    test-recipes/proto-bymass.yaml
+	preprecipe vol wbcrecipe -L 10l,20l,5hl -p params-std -c \
+	    compiled-recipes/std-mish,step-percent,SG-kitchensink.yaml
+
+	resetcount
+	preprecipe mashlimits wbcrecipe -p params-std -P mM=22l \
+	    compiled-recipes/std-infusion,single-mass-basic.yaml
+	preprecipe mashlimits wbcrecipe -p params-std -P mM=24l \
+	    compiled-recipes/std-mish,step-mass-kitchensink.yaml
+	preprecipe mashlimits wbcrecipe -p params-std -P mM=25l \
+	    compiled-recipes/std-decoction-percent,SG-kitchensink.yaml
+	preprecipe mashlimits wbcrecipe -p params-std -P lM=14l \
+	    compiled-recipes/std-infusion,single-mass-basic.yaml
+	preprecipe mashlimits wbcrecipe -p params-std -P lM=14l \
+	    compiled-recipes/std-decoction-percent,SG-kitchensink.yaml
+	preprecipe mashlimits wbcrecipe -p params-std -P mM=29l -P lM=14l \
+	    compiled-recipes/std-mish,step-mass-kitchensink.yaml
 
 	resetcount
 	preprecipe noboil wbcrecipe -p params-std \
@@ -140,6 +170,20 @@ doprep ()
 	preprecipe pagelen wbcrecipe -p params-std -P oP=400 \
 	    test-recipes/proto-bymass.yaml
 
+	resetcount
+	preprecipe solver wbcrecipe -p params-std -P solver=newton \
+	    test-recipes/proto-bymass.yaml
+	preprecipe solver wbcrecipe -p params-std -P solver=newton \
+	    compiled-recipes/std-mish,step-percent,SG-kitchensink.yaml
+	preprecipe solver wbcrecipe -p params-std -P solver=newton \
+	    test-recipes/applewine.yaml
+
+	resetcount
+	preprecipe sweep wbcsweep -p params-std -P me=70%..90%/10% \
+	    -P kl=1l..3l/1l test-recipes/proto-bymass.yaml
+	preprecipe sweep wbcsweep -p params-std -c -P mr=40%..60%/10% \
+	    compiled-recipes/std-mish,step-percent,SG-kitchensink.yaml
+
 	resetcount
 	preprecipe liquid-maximum wbcrecipe -p params-std \
 	    test-recipes/applewine.yaml
@@ -191,6 +235,28 @@ _onetest ()
 	return ${rv}
 }
 
+checkimports ()
+{
+
+	rv=0
+	for x in ${LIGHTTOOLS}; do
+		python3 -X importtime ../bin/${x} -h 2>&1 >/dev/null \
+		    | awk -F'|' -v tool=${x} -v budget=${IMPORTBUDGET} '
+			!/^import time: *[0-9]/ { next }
+			$3 ~ /WBC\.wbc$|WBC\.fermentables_builtin$|yaml$/ {
+				heavy = heavy $3
+			}
+			$3 ~ /^ WBC/ { us += $2 }
+			END {
+				printf("importtime %-16s %6.1fms%s\n",
+				    tool, us/1000, heavy)
+				exit (us/1000 > budget || heavy != "")
+			}' || rv=1
+	done
+	[ ${rv} -eq 0 ] || msg import time budget ${IMPORTBUDGET}ms exceeded
+	return ${rv}
+}
+
 dotest ()
 {
 
@@ -218,6 +284,7 @@ dotest ()
 	checkfails Comparisons ${fc}
 	checkfails Tests ${ft}
 	[ ! -f ${ft} -a ! -f ${fc} ] || die 'failed'
+	checkimports || die 'failed'
 
 	echo '>> no regressions.  run "reset" if you no longer need testdata'
 }
@@ -262,6 +329,8 @@ elif [ $1 = 'test' ]; then
 	dotest
 elif [ $1 = 'reset' ]; then
 	doreset
+elif [ $1 = 'imports' ]; then
+	checkimports || exit 1
 else
 	msg invalid command $1
 	usage